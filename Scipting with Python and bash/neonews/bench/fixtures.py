@@ -0,0 +1,224 @@
+"""
+HTTP fixtures for the benchmarks: ApiClient responses recorded once, replayed offline.
+
+    python bench/fixtures.py record --countries Romania France --topics technology --languages en
+    python bench/fixtures.py synth --countries Romania France --topics technology business --articles 10
+
+`record` runs the real ApiClient against restcountries.com and newsdata.io (it needs
+NEWSDATA_API_KEY) and stores every response with its latency. `synth` writes a fixture of
+generated responses in the same shape, for machines without an API key; it is marked synthetic.
+The API key is never written to a fixture: it is left out of the request keys.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+FIXTURE_DIR = os.path.join(APP_DIR, "bench", "fixtures")
+DEFAULT_FIXTURE = os.path.join(FIXTURE_DIR, "default.json")
+# Response headers worth keeping: the validators ApiClient revalidates with
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+# ISO 3166-1 alpha-2 codes (restcountries.com's cca2) of the menu's countries, for synthetic fixtures
+COUNTRY_CODES = {
+    "Romania": "RO",
+    "United States": "US",
+    "United Kingdom": "GB",
+    "France": "FR",
+    "Germany": "DE",
+    "Spain": "ES"
+}
+
+
+def request_key(url, params=None):
+    """The full request URL without the API key, identical for recording and replay."""
+    params = {name: value for name, value in (params or {}).items() if name != "apikey"}
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+class RecordingSession:
+    """Wraps the real requests.Session and keeps every response ApiClient receives."""
+    def __init__(self, session):
+        self.session = session
+        self.responses = {}
+
+    def get(self, url, params=None, **kwargs):
+        start = time.perf_counter()
+        response = self.session.get(url, params=params, **kwargs)
+        self.responses[request_key(url, params)] = {
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            "body": response.json() if response.status_code == 200 else None,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+        return response
+
+
+class _Raw:
+    # ApiClient reads response.raw.retries; a replayed response was never retried
+    retries = None
+
+
+class ReplaySession:
+    """
+    Stands in for requests.Session: answers from a fixture after sleeping `latency` seconds,
+    or the recorded latency of each response when `latency` is None. Honors If-None-Match,
+    so ApiClient's revalidation path runs too. Unknown requests raise KeyError.
+    """
+    def __init__(self, fixture, latency=None):
+        self.responses = fixture["responses"]
+        self.latency = latency
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        key = request_key(url, params)
+        if key not in self.responses:
+            raise KeyError(f"No recorded response for {key}; record the fixture again with this feed")
+        recorded = self.responses[key]
+        self.calls += 1
+
+        delay = self.latency if self.latency is not None else (recorded.get("elapsed_ms") or 0) / 1000
+        if delay:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.url = key
+        response.raw = _Raw()
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        etag = recorded["headers"].get("ETag")
+        if etag and (headers or {}).get("If-None-Match") == etag:
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = recorded["status"]
+            response._content = json.dumps(recorded["body"]).encode("utf-8")
+        return response
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(path, feeds, responses, synthetic):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "recorded_at": datetime.utcnow().isoformat(),
+            "synthetic": synthetic,
+            "feeds": feeds,
+            "responses": responses
+        }, f, indent=1)
+    print(f"Wrote {len(responses)} responses for {len(feeds)} feeds to {path}")
+
+
+def record(countries, topics, languages, output):
+    """Runs the pipeline's API calls for every country/topic/language once, against the live services."""
+    # A cached country would never reach the network, and so never the fixture
+    os.environ["NEONEWS_CACHE_DIR"] = tempfile.mkdtemp(prefix="neonews-record-")
+    os.environ["STORAGE_BACKEND"] = "local"
+    from src.api import ApiClient
+
+    api = ApiClient()
+    session = RecordingSession(api.session)
+    api.session = session
+    feeds = []
+    for country in countries:
+        country_info = api.get_country_details(country)
+        if not country_info:
+            print(f"Could not find data for {country}, skipped")
+            continue
+        for topic in topics:
+            for language in languages:
+                api.get_news(country_code=country_info['cca2'], topic=topic, language=language)
+                feeds.append([country, topic, language])
+    save(output, feeds, session.responses, synthetic=False)
+
+
+def synthesize(countries, topics, languages, articles, output):
+    """Generated responses in the shape of restcountries.com and newsdata.io, no network needed."""
+    from src.api import NEWS_URL
+
+    responses = {}
+    feeds = []
+    codes = {}
+    published = datetime(2024, 5, 1, 12, 0, 0)
+    for country in countries:
+        code = COUNTRY_CODES.get(country, country[:2].upper())
+        # Two countries with one code would share (and overwrite) their news responses
+        if codes.setdefault(code, country) != country:
+            raise ValueError(f"{country} and {codes[code]} would both get the code {code}; add them to COUNTRY_CODES")
+        responses[request_key(f"https://restcountries.com/v3.1/name/{country}?fullText=true")] = {
+            "status": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": [{
+                "name": {"common": country},
+                "capital": [f"{country} City"],
+                "currencies": {"XXX": {"name": "Synthetic unit"}},
+                "languages": {"eng": "English"},
+                "cca2": code
+            }],
+            "elapsed_ms": None
+        }
+        for topic in topics:
+            for language in languages:
+                results = []
+                for idx in range(articles):
+                    published -= timedelta(minutes=7)
+                    results.append({
+                        "article_id": f"synthetic-{code}-{topic}-{language}-{idx}",
+                        "title": f"Synthetic {topic} story {idx} from {country}",
+                        "link": f"https://example.com/{code.lower()}/{topic}/{language}/{idx}",
+                        "keywords": [topic, country.lower()],
+                        "creator": ["Bench Reporter"],
+                        "description": f"A generated {topic} article used to benchmark the archive pipeline. " * 3,
+                        "content": f"Paragraph about {topic} in {country}. " * 60,
+                        "pubDate": published.strftime("%Y-%m-%d %H:%M:%S"),
+                        "source_id": f"source{idx % 5}",
+                        "language": language,
+                        "country": [country.lower()],
+                        "category": [topic]
+                    })
+                params = {"category": topic, "country": code, "language": language}
+                responses[request_key(NEWS_URL, params)] = {
+                    "status": 200,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": {"status": "success", "totalResults": articles, "results": results, "nextPage": None},
+                    "elapsed_ms": None
+                }
+                feeds.append([country, topic, language])
+    save(output, feeds, responses, synthetic=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Record or generate HTTP fixtures for the neonews benchmarks")
+    parser.add_argument("mode", choices=["record", "synth"])
+    parser.add_argument("--countries", nargs="+", default=["Romania"], help="Country names, e.g. Romania 'United States'")
+    parser.add_argument("--topics", nargs="+", default=["technology"])
+    parser.add_argument("--languages", nargs="+", default=["en"], help="Language codes")
+    parser.add_argument("--articles", type=int, default=10, help="synth: articles per feed")
+    parser.add_argument("--output", default=DEFAULT_FIXTURE)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # config.py insists on a key; a synthetic fixture never uses it
+    if args.mode == "synth":
+        os.environ.setdefault("NEWSDATA_API_KEY", "replay")
+        os.environ["STORAGE_BACKEND"] = "local"
+        synthesize(args.countries, args.topics, args.languages, args.articles, args.output)
+    else:
+        record(args.countries, args.topics, args.languages, args.output)
+
+
+if __name__ == "__main__":
+    main()
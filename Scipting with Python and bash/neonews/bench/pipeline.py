@@ -0,0 +1,265 @@
+"""
+End-to-end benchmark of main.fetch_and_display_news, replayed from a fixture (see bench/fixtures.py):
+
+    python bench/pipeline.py --iterations 20
+    python bench/pipeline.py --backend moto --latency 0.05 --storage-latency 0.01 --output results.json
+
+Every iteration runs the real pipeline for each feed of the fixture: country lookup, news
+fetch, archiving through AWSClient.save_articles and rendering, against a fresh archive:
+  --backend local   LocalBackend (SQLite & files) in a temporary directory
+  --backend moto    AWSBackend (DynamoDB & S3) inside moto's in-memory AWS (pip install moto)
+HTTP responses are replayed with their recorded latency, or --latency seconds each. The
+newsdata.io rate limit is lifted, since no request leaves the machine. The country cache
+starts empty in every iteration unless --warm-cache is set.
+
+Prints per-stage latency percentiles, articles archived per second and, from one more
+iteration run under tracemalloc (so tracing doesn't slow the timed ones), peak memory, as JSON.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from bench import fixtures
+
+# Where each stage's time comes from
+STAGES = {
+    "country_lookup": "ApiClient.get_country_details",
+    "news_fetch": "ApiClient.get_news",
+    "archive": "AWSClient.save_articles (dedup, puts and uploads, wall time)",
+    "item_put": "StorageBackend.put_item_if_absent (DynamoDB put, per call)",
+    "blob_put": "StorageBackend.put_blob (S3 put, per call)",
+    "render": "console.print of panels and tables",
+    "total": "fetch_and_display_news, per feed"
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(values_ms):
+    """count, mean, sum and p50/p95/p99/max of durations in milliseconds."""
+    if not values_ms:
+        return {"count": 0}
+    return {
+        "count": len(values_ms),
+        "mean": round(sum(values_ms) / len(values_ms), 3),
+        "p50": round(percentile(values_ms, 50), 3),
+        "p95": round(percentile(values_ms, 95), 3),
+        "p99": round(percentile(values_ms, 99), 3),
+        "max": round(max(values_ms), 3),
+        "sum": round(sum(values_ms), 3)
+    }
+
+
+class Timings:
+    """Thread-safe lists of durations (ms) by stage; archiving calls the backend from a thread pool."""
+    def __init__(self):
+        self.durations = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, ms):
+        with self._lock:
+            self.durations.setdefault(stage, []).append(ms)
+
+
+class Instrumented:
+    """
+    Proxy that times the listed methods of `target` as stages and delegates everything else,
+    so the pipeline code runs unchanged. `delay` seconds are added to every timed call.
+    """
+    def __init__(self, target, stages, timings, delay=0.0):
+        self._target = target
+        self._stages = stages
+        self._timings = timings
+        self._delay = delay
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        stage = self._stages.get(name)
+        if stage is None:
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                if self._delay:
+                    time.sleep(self._delay)
+                return attr(*args, **kwargs)
+            finally:
+                self._timings.record(stage, (time.perf_counter() - start) * 1000)
+        return timed
+
+
+def configure_environment(backend, work_dir):
+    """Points config.py at throwaway locations before anything from src/ is imported."""
+    os.environ.setdefault("NEWSDATA_API_KEY", "replay")
+    os.environ["NEONEWS_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    os.environ["NEWSDATA_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["NEWSDATA_BURST"] = "1000"
+    if backend == "local":
+        os.environ["STORAGE_BACKEND"] = "local"
+        os.environ["LOCAL_STORAGE_DIR"] = os.path.join(work_dir, "archive")
+    else:
+        # Forced, so a benchmark can never touch a real table or bucket
+        os.environ.update({
+            "STORAGE_BACKEND": "aws",
+            "AWS_REGION": "eu-west-1",
+            "DYNAMODB_TABLE": "neonews-bench",
+            "S3_BUCKET_NAME": "neonews-bench",
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_SESSION_TOKEN": "testing"
+        })
+
+
+class PipelineBench:
+    def __init__(self, args, fixture, work_dir):
+        self.args = args
+        self.fixture = fixture
+        self.work_dir = work_dir
+        self.timings = Timings()
+
+        import main
+        from src.api import ApiClient
+        self.main = main
+        self.api = ApiClient()
+        self.session = fixtures.ReplaySession(fixture, latency=args.latency)
+        self.api.session = self.session
+
+    @contextlib.contextmanager
+    def fresh_storage(self, iteration):
+        """A new, empty archive (and empty local indexes) for one iteration."""
+        if self.args.backend == "moto":
+            from moto import mock_aws
+            with mock_aws():
+                from src.storage_aws import AWSBackend
+                yield AWSBackend()
+        else:
+            from src.storage_local import LocalBackend
+            root = os.path.join(self.work_dir, "archive", f"run-{iteration}")
+            yield LocalBackend(root=root)
+            shutil.rmtree(root, ignore_errors=True)
+
+    def run_iteration(self, iteration, timings):
+        """Runs every feed of the fixture once. Returns the number of articles archived."""
+        from rich.console import Console
+        from src.aws_handler import AWSClient
+
+        with self.fresh_storage(iteration) as backend:
+            aws = AWSClient(backend=Instrumented(backend, {
+                "put_item_if_absent": "item_put",
+                "put_blob": "blob_put"
+            }, timings, delay=self.args.storage_latency))
+            # The moto account is new every time, but the dedup index lives in the cache database
+            aws.dedup.clear()
+            aws.search.clear()
+            aws.init_resources()
+
+            self.main._clients["api"] = Instrumented(self.api, {
+                "get_country_details": "country_lookup",
+                "get_news": "news_fetch"
+            }, timings)
+            self.main._clients["aws"] = Instrumented(aws, {"save_articles": "archive"}, timings)
+            self.main.console = Instrumented(Console(file=io.StringIO(), width=120), {"print": "render"}, timings)
+
+            for country, topic, language in self.fixture["feeds"]:
+                if not self.args.warm_cache:
+                    self.api.country_cache.delete(country.lower())
+                start = time.perf_counter()
+                self.main.fetch_and_display_news(country, topic, language)
+                timings.record("total", (time.perf_counter() - start) * 1000)
+            # Cleared above, so it holds exactly the articles this iteration archived
+            return aws.search.count()
+
+    def run(self):
+        """Returns (articles archived by the timed iterations, peak traced memory in bytes)."""
+        articles = 0
+        # The pipeline prints to the real stdout too (progress spinners, backend messages)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for iteration in range(self.args.iterations):
+                articles += self.run_iteration(iteration, self.timings)
+
+            tracemalloc.start()
+            self.run_iteration(self.args.iterations, Timings())
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return articles, peak
+
+    def report(self, articles, peak):
+        # Throughput of the pipeline itself, without creating the table and bucket between iterations
+        seconds = sum(self.timings.durations.get("total", [])) / 1000
+        return {
+            "python": sys.version.split()[0],
+            "fixture": {
+                "path": self.args.fixture,
+                "synthetic": self.fixture.get("synthetic", False),
+                "recorded_at": self.fixture.get("recorded_at"),
+                "feeds": len(self.fixture["feeds"])
+            },
+            "backend": self.args.backend,
+            "iterations": self.args.iterations,
+            "latency_s": "recorded" if self.args.latency is None else self.args.latency,
+            "storage_latency_s": self.args.storage_latency,
+            "warm_cache": self.args.warm_cache,
+            "http_requests": self.session.calls,
+            "stages_ms": {stage: summarize(self.timings.durations.get(stage, [])) for stage in STAGES},
+            "articles_archived": articles,
+            "articles_per_second": round(articles / seconds, 1) if seconds else 0,
+            "peak_memory_kb": round(peak / 1024, 1)
+        }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay benchmark of the neonews fetch-and-archive pipeline")
+    parser.add_argument("--fixture", default=fixtures.DEFAULT_FIXTURE, help="written by bench/fixtures.py record|synth")
+    parser.add_argument("--backend", choices=["local", "moto"], default="local")
+    parser.add_argument("--iterations", type=int, default=10, help="runs over every feed of the fixture")
+    parser.add_argument("--latency", type=float, help="seconds per HTTP response (default: as recorded)")
+    parser.add_argument("--storage-latency", type=float, default=0.0, help="seconds added to every item put and blob upload")
+    parser.add_argument("--warm-cache", action="store_true", help="keep country details cached between iterations")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.fixture):
+        sys.exit(f"No fixture at {args.fixture}: run `python bench/fixtures.py record` (or `synth`) first")
+    if args.backend == "moto":
+        try:
+            import moto  # noqa: F401
+        except ImportError:
+            sys.exit("--backend moto needs moto: pip install moto")
+
+    work_dir = tempfile.mkdtemp(prefix="neonews-bench-")
+    try:
+        configure_environment(args.backend, work_dir)
+        bench = PipelineBench(args, fixtures.load(args.fixture), work_dir)
+        report = bench.report(*bench.run())
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
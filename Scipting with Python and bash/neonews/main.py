@@ -1,18 +1,62 @@
+from src.startup import StartupProfiler, BackgroundTask
+import argparse
+import itertools
 import sys
+import threading
 import time
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
-from rich import print as rprint
-import questionary
 
-from src.api import ApiClient
-from src.aws_handler import AWSClient
+profiler = StartupProfiler()
+
+with profiler.timed("import rich"):
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.table import Table
+    from rich import print as rprint
+
+from src.archive import SAVED, DUPLICATE, FAILED
 
 console = Console()
-api = ApiClient()
-aws = AWSClient()
+
+# boto3 / requests are the slowest imports by far: clients are built on first use
+_clients = {}
+_clients_lock = threading.Lock()
+_startup_task = None
+
+def get_api():
+    with _clients_lock:
+        if "api" not in _clients:
+            with profiler.timed("import src.api (requests)"):
+                from src.api import ApiClient
+            with profiler.timed("ApiClient()"):
+                _clients["api"] = ApiClient()
+        return _clients["api"]
+
+def get_aws():
+    with _clients_lock:
+        if "aws" not in _clients:
+            with profiler.timed("import src.aws_handler (boto3)"):
+                from src.aws_handler import AWSClient
+            with profiler.timed("AWSClient()"):
+                _clients["aws"] = AWSClient()
+        return _clients["aws"]
+
+def get_search():
+    """The local search index, opened without building the storage backend (no boto3, no network)."""
+    with _clients_lock:
+        if "search" not in _clients:
+            from src.config import CACHE_DB_PATH
+            from src.search import SearchIndex
+            from src.storage import archive_scope
+            _clients["search"] = SearchIndex(CACHE_DB_PATH, scope=archive_scope())
+        return _clients["search"]
+
+COUNTRIES = ["Romania", "United States", "United Kingdom", "France", "Germany", "Spain"]
+
+ARCHIVE_LABELS = {
+    SAVED: "[green]✔[/green]",
+    DUPLICATE: "[dim]duplicate[/dim]",
+    FAILED: "[red]✘ failed[/red]"
+}
 
 language_map = {
     "English": "en",
@@ -42,7 +86,66 @@ def print_banner():
         padding=(1, 1)
     ))
 
+def start_background_init():
+    """Checks AWS resources and warms the country cache while the menu is already on screen."""
+    global _startup_task
+
+    def init():
+        aws = get_aws()
+        with profiler.timed("aws.init_resources()"):
+            aws.init_resources()
+        api = get_api()
+        with profiler.timed("api.prewarm_countries()"):
+            api.prewarm_countries(COUNTRIES)
+
+    # Its messages (e.g. "Creating DynamoDB Table") would garble the menu: shown by wait_for_background_init()
+    _startup_task = BackgroundTask(init, name="startup-init", capture_output=True)
+
+def wait_for_background_init():
+    """Blocks until the background checks are done; a no-op once they have finished."""
+    global _startup_task
+    if _startup_task is None:
+        return
+    task, _startup_task = _startup_task, None
+    try:
+        if task.is_alive():
+            with console.status("[bold green]Checking AWS Resources...[/bold green]", spinner="dots"):
+                task.wait()
+        else:
+            task.wait()
+    finally:
+        if task.output:
+            sys.stdout.write(task.output)
+    console.print("[green]✔ AWS Connection Established[/green]")
+
+def print_startup_profile():
+    table = Table(title="Startup Profile")
+    table.add_column("Phase", style="cyan")
+    table.add_column("ms", justify="right")
+    for label, seconds in profiler.timings:
+        table.add_row(label, f"{seconds * 1000:.1f}")
+    console.print(table)
+
+def print_http_stats():
+    if "api" not in _clients:
+        return
+    stats = _clients["api"].http_stats()
+    if not stats["requests"]:
+        return
+
+    table = Table(title="HTTP Session Stats", title_style="dim")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    for name, value in stats.items():
+        table.add_row(name.replace("_", " ").capitalize(), str(value))
+    console.print(table)
+
 def fetch_and_display_news(selected_country, selected_topic, selected_language_code):
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    wait_for_background_init()
+    api, aws = get_api(), get_aws()
+
     #Fetch Data
     country_info = None
     articles = []
@@ -56,7 +159,6 @@ def fetch_and_display_news(selected_country, selected_topic, selected_language_c
         #Country Data
         task1 = progress.add_task(description="Fetching Country Data...", total=1)
         country_info = api.get_country_details(selected_country)
-        time.sleep(0.5)
         progress.advance(task1)
 
         if not country_info:
@@ -90,33 +192,201 @@ def fetch_and_display_news(selected_country, selected_topic, selected_language_c
     table.add_column("No.", style="cyan", no_wrap=True)
     table.add_column("Title", style="white")
     table.add_column("Source", style="magenta")
+    table.add_column("Archived", no_wrap=True)
 
-    with console.status("[bold blue]Archiving to AWS DynamoDB & S3...[/bold blue]"):
-        for idx, article in enumerate(articles, 1):
-            aws.save_article(article, selected_topic)
-            title = article.get('title', 'No Title')
-            source = article.get('link', 'Unknown')
-            table.add_row(str(idx), title[:60] + "...", source)
+    with console.status(f"[bold blue]Archiving to {aws.backend.description}...[/bold blue]"):
+        results = aws.save_articles(articles, selected_topic)
 
-    console.print(table)
-    console.print(f"\n[bold green]✔ Successfully saved {len(articles)} articles to AWS![/bold green]")
+    for idx, (article, status) in enumerate(zip(articles, results), 1):
+        title = article.get('title', 'No Title')
+        source = article.get('link', 'Unknown')
+        archived = ARCHIVE_LABELS[status]
+        table.add_row(str(idx), title[:60] + "...", source, archived)
 
-def main():
-    print_banner()
+    console.print(table)
+    saved, duplicates, failed = (results.count(status) for status in (SAVED, DUPLICATE, FAILED))
+    if failed:
+        console.print(f"\n[bold yellow]⚠ Saved {saved} new articles to AWS, {duplicates} already archived, {failed} failed.[/bold yellow]")
+    else:
+        console.print(f"\n[bold green]✔ Successfully saved {saved} new articles to AWS ({duplicates} already archived)![/bold green]")
 
-    #Initialize AWS Resources
+def resolve_feeds(api, aws, countries, topics, languages):
+    """
+    Checks the storage resources and turns country names and languages into
+    (country_code, topic, language_code) feeds. Returns (feeds, {country_code: country name}).
+    """
     with console.status("[bold green]Checking AWS Resources...[/bold green]", spinner="dots"):
         aws.init_resources()
-        time.sleep(1)
-    console.print("[green]✔ AWS Connection Established[/green]")
+        api.prewarm_countries(countries)
+
+    country_names = {}
+    for country in countries:
+        country_info = api.get_country_details(country)
+        if not country_info:
+            console.print(f"[bold red]Could not find data for {country}[/bold red]")
+            continue
+        country_names[country_info['cca2']] = country
+
+    # Accept both menu names ("English") and codes ("en")
+    language_codes = [language_map.get(language.capitalize(), language.lower()) for language in languages]
+    return list(itertools.product(country_names, topics, language_codes)), country_names
+
+def run_fetch(countries, topics, languages, workers, max_items=5, resume=False):
+    """Non-interactive mode: fetches every country/topic/language combination and archives it."""
+    api, aws = get_api(), get_aws()
+    feeds, country_names = resolve_feeds(api, aws, countries, topics, languages)
+    if not feeds:
+        return
+
+    console.print(f"[bold blue]Fetching {len(feeds)} feeds with {workers} workers...[/bold blue]")
+    summary = Table(title="Archive Run")
+    summary.add_column("Country", style="cyan")
+    summary.add_column("Topic", style="white")
+    summary.add_column("Language", style="magenta")
+    summary.add_column("Fetched", justify="right")
+    summary.add_column("New", justify="right")
+    summary.add_column("Duplicates", justify="right")
+
+    fetched_total = saved_total = duplicates_total = 0
+    for (country_code, topic, language), articles in api.fan_out_news(feeds, workers, limit=max_items, resume=resume):
+        # Archive each feed as soon as it arrives, while the other fetches are still running
+        results = aws.save_articles(articles, topic) if articles else []
+        saved, duplicates = results.count(SAVED), results.count(DUPLICATE)
+        fetched_total += len(articles)
+        saved_total += saved
+        duplicates_total += duplicates
+        country = country_names[country_code]
+        console.print(f"  ✔ {country} / {topic} / {language}: {len(articles)} fetched, {saved} new, {duplicates} duplicates")
+        summary.add_row(country, topic, language, str(len(articles)), str(saved), str(duplicates))
+
+    console.print(summary)
+    console.print(
+        f"\n[bold green]✔ Archived {saved_total} new articles from {len(feeds)} feeds "
+        f"({duplicates_total} duplicates skipped, {fetched_total - saved_total - duplicates_total} failed).[/bold green]"
+    )
+
+def run_watch(countries, topics, languages, interval=None, max_items=None, once=False):
+    """
+    Daemon mode: polls every country/topic/language feed on a schedule and archives only
+    articles newer than what the feed already delivered. --once polls each feed a single time.
+    """
+    from src.watch import FeedWatcher
+
+    api, aws = get_api(), get_aws()
+    feeds, country_names = resolve_feeds(api, aws, countries, topics, languages)
+    if not feeds:
+        return
+
+    options = {name: value for name, value in (("interval", interval), ("max_items", max_items)) if value is not None}
+    watcher = FeedWatcher(api, aws, feeds, **options)
+    if once:
+        console.print(f"[bold blue]Polling {len(feeds)} feeds once...[/bold blue]")
+        polls = watcher.poll_all()
+    else:
+        console.print(
+            f"[bold blue]Watching {len(feeds)} feeds, each every {watcher.interval:.0f}s "
+            f"(±{watcher.jitter:.0%}). Press Ctrl+C to stop.[/bold blue]"
+        )
+        polls = watcher.run()
+
+    for (country_code, topic, language), articles, results in polls:
+        saved, duplicates, failed = (results.count(status) for status in (SAVED, DUPLICATE, FAILED))
+        line = f"{time.strftime('%H:%M:%S')} {country_names[country_code]} / {topic} / {language}: "
+        if not articles:
+            console.print(f"  [dim]{line}nothing new[/dim]")
+        elif failed:
+            console.print(f"  [yellow]⚠ {line}{len(articles)} new, {saved} saved, {duplicates} duplicates, {failed} failed[/yellow]")
+        else:
+            console.print(f"  ✔ {line}{len(articles)} new, {saved} saved, {duplicates} duplicates")
+
+def run_search(query, topic=None, since=None, until=None, limit=20, rebuild=False):
+    """Searches the local full-text index of archived articles; --rebuild re-creates it from the archive first."""
+    if rebuild:
+        aws = get_aws()
+        with console.status(f"[bold blue]Re-indexing the {aws.backend.description} archive...[/bold blue]"):
+            indexed = aws.rebuild_search_index()
+        console.print(f"[green]✔ Indexed {indexed} archived articles.[/green]")
+
+    index = get_search()
+    start = time.perf_counter()
+    try:
+        results = index.search(query, topic=topic, since=since, until=until, limit=limit)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not results:
+        console.print(f"[yellow]No archived articles match.[/yellow] [dim]({index.count()} indexed, {elapsed_ms:.1f} ms)[/dim]")
+        return
+
+    table = Table(title=f"Search: {query}" if query else "Latest Archived Articles")
+    table.add_column("Published", style="cyan", no_wrap=True)
+    table.add_column("Topic", style="magenta")
+    table.add_column("Source", style="magenta")
+    table.add_column("Title", style="white")
+    table.add_column("Link", style="dim")
+    for article in results:
+        title = article['title'] or 'No Title'
+        table.add_row(article['published_at'], article['topic'], article['source'],
+                      title[:60] + ("..." if len(title) > 60 else ""), article['link'])
+    console.print(table)
+    console.print(f"[dim]{len(results)} results from {index.count()} indexed articles in {elapsed_ms:.1f} ms[/dim]")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="NeoNews CLI")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report import and initialization timings, then exit")
+    subparsers = parser.add_subparsers(dest="command")
+
+    fetch = subparsers.add_parser("fetch", help="Fetch and archive every country/topic/language combination, without menus")
+    fetch.add_argument("--countries", nargs="+", required=True, help="Country names, e.g. Romania 'United States'")
+    fetch.add_argument("--topics", nargs="+", required=True, help="News topics, e.g. technology business")
+    fetch.add_argument("--languages", nargs="+", default=["en"], help="Language names or codes (default: en)")
+    fetch.add_argument("--workers", type=int, help="Concurrent requests, default FETCH_WORKERS (the newsdata.io rate limit still applies)")
+    fetch.add_argument("--max-items", type=int, default=5, help="Articles to read per feed, following pagination (default: 5)")
+    fetch.add_argument("--resume", action="store_true", help="Continue each feed from its last saved page (for backfills)")
+
+    watch = subparsers.add_parser("watch", help="Poll feeds on a schedule and archive only new articles, until stopped")
+    watch.add_argument("--countries", nargs="+", required=True, help="Country names, e.g. Romania 'United States'")
+    watch.add_argument("--topics", nargs="+", required=True, help="News topics, e.g. technology business")
+    watch.add_argument("--languages", nargs="+", default=["en"], help="Language names or codes (default: en)")
+    watch.add_argument("--interval", type=float, help="Seconds between polls of each feed, default WATCH_INTERVAL (stretched to fit the quota)")
+    watch.add_argument("--max-items", type=int, help="Most articles read by a feed's first poll, default WATCH_MAX_ITEMS")
+    watch.add_argument("--once", action="store_true", help="Poll every feed once and exit (e.g. from cron)")
+
+    search = subparsers.add_parser("search", help="Search archived articles offline, in the local full-text index")
+    search.add_argument("query", nargs="*", help="Words or an FTS5 query, e.g. climate 'title:summit'; omit to list the newest articles")
+    search.add_argument("--topic", help="Only articles archived under this topic")
+    search.add_argument("--since", help="Published on or after this date/time, e.g. 2024-05-01")
+    search.add_argument("--until", help="Published on or before this date/time, e.g. 2024-05-31")
+    search.add_argument("--limit", type=int, default=20, help="Maximum results (default: 20)")
+    search.add_argument("--rebuild", action="store_true", help="Re-create the index from the archived article bodies first")
+
+    return parser.parse_args(argv)
+
+def main(profile_startup=False):
+    with profiler.timed("print_banner()"):
+        print_banner()
+
+    with profiler.timed("import questionary"):
+        import questionary
+
+    #Initialize AWS Resources & pre-warm the country cache in the background.
+    #Started after the last import so it doesn't compete for the GIL with the first prompt
+    start_background_init()
+    profiler.mark("time to first prompt")
+
+    if profile_startup:
+        wait_for_background_init()
+        print_startup_profile()
+        return
 
     while True:
         #User Selections about Country and News Topic
-        countries = ["Romania","United States", "United Kingdom", "France", "Germany", "Spain", "Exit"]
-        
         selected_country = questionary.select(
             "Select a Country (fan favourites):",
-            choices=countries
+            choices=COUNTRIES + ["Exit"]
         ).ask()
 
         if selected_country == "Exit":
@@ -152,8 +422,19 @@ def main():
                 break
 
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
     try:
-        main()
+        if args.command == "fetch":
+            from src.config import FETCH_WORKERS
+            run_fetch(args.countries, args.topics, args.languages, args.workers or FETCH_WORKERS, args.max_items, args.resume)
+        elif args.command == "watch":
+            run_watch(args.countries, args.topics, args.languages, args.interval, args.max_items, args.once)
+        elif args.command == "search":
+            run_search(" ".join(args.query), args.topic, args.since, args.until, args.limit, args.rebuild)
+        else:
+            main(profile_startup=args.profile_startup)
     except KeyboardInterrupt:
         console.print("\n[red]Exiting...[/red]")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
+    finally:
+        print_http_stats()
\ No newline at end of file
@@ -1,16 +1,100 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 import requests
-from src.config import NEWSDATA_API_KEY
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+from src.cache import DiskCache
+from src.config import (
+    NEWSDATA_API_KEY, CACHE_DB_PATH, COUNTRY_CACHE_TTL, COUNTRY_CACHE_MAX_ENTRIES,
+    HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR,
+    NEWSDATA_REQUESTS_PER_MINUTE, NEWSDATA_BURST, FETCH_WORKERS
+)
+from src.ratelimit import RateLimiter
+
+PREWARM_WORKERS = 4
+NEWS_URL = "https://newsdata.io/api/1/latest"
+
+# (connect, read) timeouts in seconds, per upstream host
+HOST_TIMEOUTS = {
+    "restcountries.com": (3.05, 10),
+    "newsdata.io": (3.05, 20),
+}
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# How many URLs we remember ETag / Last-Modified validators for
+VALIDATOR_CACHE_SIZE = 64
 
 class ApiClient:
+    def __init__(self):
+        self.country_cache = DiskCache(
+            CACHE_DB_PATH,
+            namespace="countries",
+            ttl=COUNTRY_CACHE_TTL,
+            max_entries=COUNTRY_CACHE_MAX_ENTRIES
+        )
+        # Last unread newsdata.io page per feed, for resumable backfills
+        self.news_cursors = DiskCache(CACHE_DB_PATH, namespace="news_cursors")
+
+        # One keep-alive session for every call: no TCP+TLS handshake per request
+        retry = Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self._adapter = HTTPAdapter(pool_connections=len(HOST_TIMEOUTS), pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        # Shared by every thread calling newsdata.io, so fan-outs stay inside the quota
+        self.news_limiter = RateLimiter(NEWSDATA_REQUESTS_PER_MINUTE, per=60.0, burst=NEWSDATA_BURST)
+
+        self._lock = threading.Lock()
+        self._validators = OrderedDict()  # url -> (etag, last_modified, payload)
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "not_modified": 0,
+            "errors": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+        }
+
     def get_country_details(self, country_name):
+        """Returns capital, currency, and language, served from the local cache when possible."""
+        key = country_name.lower()
+        details = self.country_cache.get(key)
+        if details is None:
+            details = self._fetch_country_details(country_name)
+            if details:
+                self.country_cache.set(key, details)
+        return details
+
+    def prewarm_countries(self, country_names):
+        """Fetches every country that is not cached yet, concurrently."""
+        missing = [name for name in country_names if self.country_cache.get(name.lower()) is None]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=min(PREWARM_WORKERS, len(missing))) as pool:
+            list(pool.map(self.get_country_details, missing))
+
+    def _fetch_country_details(self, country_name):
         """Fetches capital, currency, and language from REST Countries."""
         url = f"https://restcountries.com/v3.1/name/{country_name}?fullText=true"
-        response = requests.get(url)
-        
-        if response.status_code != 200:
+        data = self._get_json(url)
+
+        if not data:
             return None
 
-        data = response.json()[0]
+        data = data[0]
         
         # Extracting specific data
         currency_code = list(data.get("currencies", {}).keys())[0]
@@ -24,20 +108,198 @@ class ApiClient:
             "cca2": data.get("cca2")
         }
 
-    def get_news(self, country_code, topic, language):
-        """Fetches news from Newsdata.io."""
-        base_url = "https://newsdata.io/api/1/latest"
-        params = {
-            "apikey": NEWSDATA_API_KEY,
-            "category": topic,
-            "country": country_code,
-            "language": language
-        }
-        
-        response = requests.get(base_url, params=params)
-        
-        if response.status_code != 200:
-            return []
+    def get_news(self, country_code, topic, language, limit=5):
+        """Fetches the latest `limit` articles from Newsdata.io."""
+        return list(itertools.islice(self.iter_news(country_code, topic, language), limit))
+
+    def iter_news(self, country_code, topic, language, max_items=None, resume=False):
+        """
+        Yields articles one at a time, following Newsdata.io's `nextPage` cursor lazily,
+        so only a single page is ever held in memory.
+        With resume=True the position after the last article yielded is persisted per feed
+        ({"page", "offset"}): the next page once a page is used up, or the offset into the
+        current page when `max_items` stops the run early. The next run starts at the first
+        article not yet yielded; a run that crashes or runs out of quota re-reads the page it
+        was on.
+        The generator's return value (StopIteration.value) is False if a page could not be
+        fetched, so callers can tell a failed read from the end of the feed.
+        """
+        cursor_key = f"{country_code}:{topic}:{language}"
+        cursor = self.news_cursors.get(cursor_key) if resume else None
+        if isinstance(cursor, str):
+            # Saved before offsets were tracked: just the page
+            cursor = {"page": cursor, "offset": 0}
+        page, offset = (cursor["page"], cursor["offset"]) if cursor else (None, 0)
+        yielded = 0
+
+        while True:
+            params = {
+                "apikey": NEWSDATA_API_KEY,
+                "category": topic,
+                "country": country_code,
+                "language": language
+            }
+            if page:
+                params["page"] = page
+
+            self.news_limiter.acquire()
+            # Only the first page is worth revalidating; deeper pages would just fill the validator cache
+            data = self._get_json(NEWS_URL, params=params, conditional=page is None)
+            if not data:
+                return False
+
+            results = data.get("results") or []
+            next_page = data.get("nextPage")
+            for idx in range(offset, len(results)):
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    # Saved before the last article is handed out: the caller won't ask for more
+                    if resume:
+                        if idx + 1 < len(results):
+                            self._save_cursor(cursor_key, page, idx + 1)
+                        else:
+                            self._save_cursor(cursor_key, next_page, 0)
+                    yield results[idx]
+                    return True
+                yield results[idx]
 
-        data = response.json()
-        return data.get("results", [])[:5] # Return max 5 results
\ No newline at end of file
+            if resume:
+                self._save_cursor(cursor_key, next_page, 0)
+            if not next_page:
+                return True
+            page, offset = next_page, 0
+
+    def _save_cursor(self, cursor_key, page, offset):
+        """Persists where a feed's next resumed run starts; past the last page it starts over."""
+        if page is None and offset == 0:
+            self.news_cursors.delete(cursor_key)
+        else:
+            self.news_cursors.set(cursor_key, {"page": page, "offset": offset})
+
+    def fan_out_news(self, feeds, workers=FETCH_WORKERS, limit=5, resume=False):
+        """
+        Fetches every (country_code, topic, language) feed concurrently and yields
+        (feed, articles) as each call completes, so callers can archive while the
+        remaining feeds are still in flight.
+        """
+        def fetch(feed):
+            return list(self.iter_news(*feed, max_items=limit, resume=resume))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fetch, feed): feed for feed in feeds}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _get_json(self, url, params=None, conditional=True):
+        """
+        GETs a JSON document through the pooled session.
+        When `conditional` is set, revalidates with ETag / Last-Modified if the upstream
+        sent them, so an unchanged document comes back as a 304 and is served from memory.
+        Returns None on any non-200 outcome, or a 200 whose body isn't JSON.
+        """
+        cache_key = requests.Request("GET", url, params=params).prepare().url
+        headers = {}
+        cached = None
+        if conditional:
+            with self._lock:
+                cached = self._validators.get(cache_key)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self._timeout_for(url))
+        except requests.RequestException as e:
+            self._record(time.perf_counter() - start, retries=self._retries_before(e), error=True)
+            return None
+
+        latency = time.perf_counter() - start
+        payload = None
+        invalid = False
+        if response.status_code == 200:
+            # e.g. an HTML error page or an empty body sent with a 200
+            try:
+                payload = response.json()
+            except ValueError:
+                invalid = True
+
+        retries = response.raw.retries
+        self._record(
+            latency,
+            retries=len(retries.history) if retries else 0,
+            not_modified=response.status_code == 304,
+            error=response.status_code not in (200, 304) or invalid
+        )
+
+        if response.status_code == 304 and cached:
+            return cached[2]
+        if response.status_code != 200 or invalid:
+            return None
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if conditional and (etag or last_modified):
+            with self._lock:
+                self._validators[cache_key] = (etag, last_modified, payload)
+                self._validators.move_to_end(cache_key)
+                while len(self._validators) > VALIDATOR_CACHE_SIZE:
+                    self._validators.popitem(last=False)
+        return payload
+
+    def _retries_before(self, error):
+        """
+        Retries urllib3 made before a request failed with `error`. It drops the history when it
+        gives up, but it only gives up (MaxRetryError, wrapped by requests) once all are used.
+        """
+        reason = error.args[0] if error.args else None
+        if isinstance(reason, MaxRetryError):
+            return self._adapter.max_retries.total
+        return 0
+
+    def _timeout_for(self, url):
+        host = urlparse(url).hostname or ""
+        for suffix, timeout in HOST_TIMEOUTS.items():
+            if host == suffix or host.endswith("." + suffix):
+                return timeout
+        return DEFAULT_TIMEOUT
+
+    def _record(self, latency, retries=0, not_modified=False, error=False):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["retries"] += retries
+            self._stats["not_modified"] += int(not_modified)
+            self._stats["errors"] += int(error)
+            self._stats["latency_total"] += latency
+            self._stats["latency_max"] = max(self._stats["latency_max"], latency)
+
+    def http_stats(self):
+        """Returns a snapshot of the session counters: pool reuse, retries, revalidations and latency."""
+        with self._lock:
+            stats = dict(self._stats)
+
+        # urllib3 counts every connection it opens and every request sent per host pool
+        opened = sent = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            opened += pool.num_connections
+            sent += pool.num_requests
+
+        requests_made = stats["requests"]
+        return {
+            "requests": requests_made,
+            "connections_opened": opened,
+            "connections_reused": max(sent - opened, 0),
+            "retries": stats["retries"],
+            "not_modified": stats["not_modified"],
+            "errors": stats["errors"],
+            "avg_latency_ms": round(stats["latency_total"] / requests_made * 1000, 1) if requests_made else 0.0,
+            "max_latency_ms": round(stats["latency_max"] * 1000, 1),
+        }
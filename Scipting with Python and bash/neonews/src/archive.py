@@ -0,0 +1,48 @@
+import gzip
+import json
+
+# Per-article outcome reported by AWSClient.save_articles
+SAVED = "saved"
+DUPLICATE = "duplicate"
+FAILED = "failed"
+
+PACKED_EXTENSION = ".ndjson.gz"
+INDEX_EXTENSION = ".index.json"
+
+
+def pack_articles(articles):
+    """
+    Serializes articles as compact NDJSON where every line is its own gzip member.
+    Concatenated gzip members still form one valid .gz file, and each member can be
+    decompressed on its own, so a single article is readable with a ranged GET.
+    Returns (body, ranges) with one inclusive (start, end) byte range per article.
+    """
+    members = []
+    ranges = []
+    offset = 0
+    for article in articles:
+        line = json.dumps(article, separators=(",", ":"), ensure_ascii=False) + "\n"
+        member = gzip.compress(line.encode("utf-8"), mtime=0)
+        members.append(member)
+        ranges.append((offset, offset + len(member) - 1))
+        offset += len(member)
+    return b"".join(members), ranges
+
+
+def unpack_article(member):
+    """Decodes the bytes of one packed article (a single gzip member)."""
+    return json.loads(gzip.decompress(member))
+
+
+def iter_packed(body, index):
+    """
+    Yields (article, (start, end)) for every article of a packed object, using the
+    offset index stored next to it ({article id: [start, end]}, in packing order).
+    """
+    for start, end in index.values():
+        yield unpack_article(body[start:end + 1]), (start, end)
+
+
+def byte_range(start, end):
+    """HTTP Range header value for an inclusive byte range."""
+    return f"bytes={start}-{end}"
@@ -1,65 +1,98 @@
-import boto3
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from rich import print as rprint
-from botocore.exceptions import ClientError
-from src.config import AWS_REGION, DYNAMODB_TABLE, S3_BUCKET_NAME
+from src.archive import (
+    SAVED, DUPLICATE, FAILED, PACKED_EXTENSION, INDEX_EXTENSION, pack_articles, unpack_article, iter_packed, byte_range
+)
+from src.config import ARCHIVE_WORKERS, ARCHIVE_FORMAT, ARCHIVE_PACK_MIN_ARTICLES, CACHE_DB_PATH
+from src.dedup import DedupIndex, article_hash
+from src.search import SearchIndex
+from src.storage import create_backend
 
 class AWSClient:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
-        self.s3 = boto3.client('s3', region_name=AWS_REGION)
+    """
+    Archives articles: metadata items plus raw JSON bodies, in the storage backend
+    selected by STORAGE_BACKEND (DynamoDB & S3 by default, or local SQLite & files).
+    """
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self.dedup = DedupIndex(CACHE_DB_PATH, scope=self.backend.scope)
+        self.search = SearchIndex(CACHE_DB_PATH, scope=self.backend.scope)
 
     def init_resources(self):
         """Checks if Table and Bucket exist, creates them if not."""
-        # 1. Check/Create DynamoDB
-        try:
-            table = self.dynamodb.Table(DYNAMODB_TABLE)
-            table.load()
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                print(f"⏳ Creating DynamoDB Table: {DYNAMODB_TABLE}...")
-                try:
-                    table = self.dynamodb.create_table(
-                        TableName=DYNAMODB_TABLE,
-                        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
-                        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
-                        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                    )
-                    print("Waiting for table to become ACTIVE...")
-                    table.wait_until_exists()
-                    print(f"✅ Table '{DYNAMODB_TABLE}' is now ACTIVE.")
-                except Exception as ce:
-                    print(f"❌ DynamoDB Table creation failed: {ce}")
-
-        # 2. Check/Create S3
-        if S3_BUCKET_NAME:
-            try:
-                self.s3.head_bucket(Bucket=S3_BUCKET_NAME)
-            except ClientError:
-                print(f"⏳ Creating S3 Bucket: {S3_BUCKET_NAME}...")
-                try:
-                    self.s3.create_bucket(
-                        Bucket=S3_BUCKET_NAME,
-                        CreateBucketConfiguration={
-                            'LocationConstraint': AWS_REGION
-                        }
-                    )
-                    print(f"✅ Bucket '{S3_BUCKET_NAME}' created successfully.")
-                except Exception as e:
-                    print(f"❌ S3 Creation Failed: {e}")
+        self.backend.init_resources()
 
     def save_article(self, article, topic):
         """
-        Saves metadata to DynamoDB and raw JSON content to S3.
+        Saves metadata to DynamoDB and raw JSON content to S3 (or their local equivalents).
+        """
+        return self.save_articles([article], topic)[0] == SAVED
+
+    def save_articles(self, articles, topic):
+        """
+        Archives a batch of articles, skipping the ones that are already archived.
+        Known articles are filtered by the local dedup index first, without any
+        network call; the rest go through a conditional put (which also catches
+        articles archived from another machine) and a body upload, in parallel.
+        With ARCHIVE_FORMAT=packed the bodies are uploaded first as a single object,
+        so no item ever points at missing bytes, and its offset index is written
+        last, listing only the articles whose put won (see _put_packed). Batches of fewer
+        than ARCHIVE_PACK_MIN_ARTICLES new articles (e.g. a watch poll) are stored as objects,
+        which takes fewer PUTs than a pack and its index.
+        Returns one status (SAVED / DUPLICATE / FAILED) per article, in input order.
         """
-        article_id = str(uuid.uuid4())
+        items = [self._build_item(article, topic) for article in articles]
+        results = [None] * len(items)
+
+        # 1. Local index, plus repeats inside this batch
+        known = self.dedup.known({item['id'] for item in items})
+        pending = []
+        for idx, item in enumerate(items):
+            if item['id'] in known:
+                results[idx] = DUPLICATE
+            else:
+                known.add(item['id'])
+                pending.append(idx)
+
+        # 2. Conditional put + body upload for everything the index doesn't know
+        packed = ARCHIVE_FORMAT == "packed" and len(pending) >= ARCHIVE_PACK_MIN_ARTICLES
+        pack = None
+        if pending and packed:
+            pack = self._put_packed([items[idx] for idx in pending], [articles[idx] for idx in pending], topic)
+            if pack is None:
+                for idx in pending:
+                    results[idx] = FAILED
+                pending = []
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(ARCHIVE_WORKERS, len(pending))) as pool:
+                statuses = pool.map(
+                    lambda idx: self._archive_one(items[idx], articles[idx], upload_body=not packed),
+                    pending
+                )
+                for idx, status in zip(pending, statuses):
+                    results[idx] = status
+
+        if pack is not None:
+            saved = [idx for idx in pending if results[idx] == SAVED]
+            if saved and not self._put_packed_index(*pack, [items[idx] for idx in saved]):
+                for idx in saved:
+                    results[idx] = self._roll_back(items[idx])
+
+        # 3. Remember everything the table now holds, so the next run skips it locally,
+        #    and make it searchable offline
+        self.dedup.add(items[idx]['id'] for idx in pending if results[idx] != FAILED)
+        self.search.add((items[idx], articles[idx]) for idx in pending if results[idx] != FAILED)
+        return results
+
+    def _build_item(self, article, topic):
+        """Builds the metadata item for an article, keyed by its content hash."""
+        article_id = article_hash(article)
         timestamp = datetime.utcnow().isoformat()
-        
-        # Save to DynamoDB
-        table = self.dynamodb.Table(DYNAMODB_TABLE)
-        item = {
+        return {
             'id': article_id,
             'title': article.get('title', 'No Title'),
             'topic': topic,
@@ -68,74 +101,123 @@ class AWSClient:
             'published_at': article.get('pubDate', timestamp),
             's3_key': f"{topic}/{article_id}.json"
         }
+
+    def _archive_one(self, item, article, upload_body=True):
+        """Writes one article unless the table already has it. Returns its status."""
         try:
-            table.put_item(Item=item)
+            if not self.backend.put_item_if_absent(item):
+                return DUPLICATE
         except Exception as e:
-            print(f"[DynamoDB ERROR] Could not save article: {e}")
-            return False
+            print(f"[{self.backend.items_label} ERROR] Could not save article: {e}")
+            return FAILED
 
-        # Save full content to S3
-        if S3_BUCKET_NAME:
-            try:
-                self.s3.put_object(
-                    Bucket=S3_BUCKET_NAME,
-                    Key=item['s3_key'],
-                    Body=json.dumps(article, indent=2),
-                    ContentType='application/json'
-                )
-            except Exception as e:
-                print(f"[S3 ERROR] Could not save article content: {e}")
-                return False
-        
-        return True
+        if upload_body and not self._put_body(item['s3_key'], article):
+            return self._roll_back(item)
+        return SAVED
 
-    def wipe_resources(self):
-        """Master command to destroy both DynamoDB and S3 resources."""
-        rprint("[bold red]⚠ STARTING RESOURCE DESTRUCTION ⚠[/bold red]")
-        self._nuke_dynamodb()
-        self._nuke_s3()
+    def _roll_back(self, item):
+        """Deletes the metadata of an article whose body couldn't be stored. Returns FAILED."""
+        # Otherwise the next run would take it for a duplicate
+        try:
+            self.backend.delete_item(item['id'])
+        except Exception as e:
+            print(f"[{self.backend.items_label} ERROR] Could not roll back article metadata: {e}")
+        return FAILED
+
+    def _put_packed(self, items, articles, topic):
+        """
+        Uploads all article bodies as one compressed NDJSON object and points every item
+        at its byte range. Returns (key, offsets by article id) for _put_packed_index, or None.
+        The object is written before the conditional puts decide the winners, so the bytes
+        of articles that turn out DUPLICATE or FAILED stay in it, unreachable: no item and
+        no index entry points at them.
+        """
+        day = datetime.utcnow().strftime('%Y-%m-%d')
+        key = f"{topic}/{day}/{uuid.uuid4().hex}{PACKED_EXTENSION}"
+        body, ranges = pack_articles(articles)
+        try:
+            self.backend.put_blob(key, body, 'application/gzip')
+        except Exception as e:
+            print(f"[{self.backend.blobs_label} ERROR] Could not save packed archive: {e}")
+            return None
 
-    def _nuke_dynamodb(self):
-        """Delete the DynamoDB table and wait for confirmation."""
+        for item, (start, end) in zip(items, ranges):
+            item['s3_key'] = key
+            item['s3_range'] = byte_range(start, end)
+        return key, {item['id']: [start, end] for item, (start, end) in zip(items, ranges)}
+
+    def _put_packed_index(self, key, offsets, items):
+        """Writes the offset index of a packed object, for the articles that were saved only."""
+        index = {item['id']: offsets[item['id']] for item in items}
         try:
-            table = self.dynamodb.Table(DYNAMODB_TABLE)
-            table.delete()
-            print(f"⏳ Waiting for table '{DYNAMODB_TABLE}' to be deleted...")
-            table.wait_until_not_exists()
-            print(f"✅ Table '{DYNAMODB_TABLE}' deleted.")
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                print(f"✅ Table '{DYNAMODB_TABLE}' already gone.")
-            else:
-                print(f"❌ Error deleting table: {e}")
+            self.backend.put_blob(key + INDEX_EXTENSION, json.dumps(index, separators=(",", ":")), 'application/json')
+        except Exception as e:
+            print(f"[{self.backend.blobs_label} ERROR] Could not save packed archive index: {e}")
+            return False
+        return True
+
+    def load_article(self, item):
+        """Reads the full content of an archived article back, whatever its format."""
+        if 's3_range' in item:
+            return unpack_article(self.backend.get_blob(item['s3_key'], byte_range=item['s3_range']))
+        return json.loads(self.backend.get_blob(item['s3_key']))
 
-    def _nuke_s3(self):
-        """Empty and delete the S3 bucket."""
-        if not S3_BUCKET_NAME:
-            return
+    def rebuild_search_index(self):
+        """
+        Re-creates the local search index from the blob store alone (every article
+        body, in either format), e.g. on a new machine. Returns the number of articles indexed.
+        """
+        self.search.clear()
+        blobs = set(self.backend.list_blobs())
+        # A packed object without an index holds no saved article (every put lost or failed)
+        keys = [
+            key for key in blobs
+            if not key.endswith(INDEX_EXTENSION) and (not key.endswith(PACKED_EXTENSION) or key + INDEX_EXTENSION in blobs)
+        ]
+        indexed = 0
+        with ThreadPoolExecutor(max_workers=ARCHIVE_WORKERS) as pool:
+            for entries in pool.map(self._read_archived, keys):
+                self.search.add(entries)
+                indexed += len(entries)
+        return indexed
 
-        print(f"⏳ Emptying bucket '{S3_BUCKET_NAME}'...")
+    def _read_archived(self, key):
+        """Returns (item, article) for every article stored under a blob key."""
+        topic = key.split('/', 1)[0]
+        entries = []
         try:
-            # Empty the bucket
-            while True:
-                response = self.s3.list_objects_v2(Bucket=S3_BUCKET_NAME)
-                if 'Contents' not in response:
-                    break
-
-                objects = [{'Key': obj['Key']} for obj in response['Contents']]
-                self.s3.delete_objects(Bucket=S3_BUCKET_NAME, Delete={'Objects': objects})
-                print(f"   - Deleted batch of {len(objects)} files")
-
-            # Delete the bucket itself
-            self.s3.delete_bucket(Bucket=S3_BUCKET_NAME)
-            
-            # Wait until it's actually gone
-            waiter = self.s3.get_waiter('bucket_not_exists')
-            waiter.wait(Bucket=S3_BUCKET_NAME)
-            print(f"✅ Bucket '{S3_BUCKET_NAME}' deleted.")
-
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchBucket':
-                print(f"✅ Bucket '{S3_BUCKET_NAME}' already gone.")
+            if key.endswith(PACKED_EXTENSION):
+                body = self.backend.get_blob(key)
+                index = json.loads(self.backend.get_blob(key + INDEX_EXTENSION))
+                for article, (start, end) in iter_packed(body, index):
+                    item = self._build_item(article, topic)
+                    item['s3_key'] = key
+                    item['s3_range'] = byte_range(start, end)
+                    entries.append((item, article))
             else:
-                print(f"❌ Error deleting S3: {e}")
\ No newline at end of file
+                article = json.loads(self.backend.get_blob(key))
+                entries.append((self._build_item(article, topic), article))
+        except Exception as e:
+            print(f"[{self.backend.blobs_label} ERROR] Could not read '{key}': {e}")
+        return entries
+
+    def _put_body(self, key, article):
+        """Uploads the raw JSON content of one article to the blob store."""
+        try:
+            self.backend.put_blob(key, json.dumps(article, indent=2), 'application/json')
+        except Exception as e:
+            print(f"[{self.backend.blobs_label} ERROR] Could not save article content: {e}")
+            return False
+        return True
+
+    def wipe_resources(self, keep_resources=False):
+        """
+        Master command to destroy both the metadata table and the blob store.
+        With keep_resources=True only the data is purged; the table and bucket stay.
+        """
+        rprint("[bold red]⚠ STARTING RESOURCE DESTRUCTION ⚠[/bold red]")
+        self.backend.wipe_items(keep_table=keep_resources)
+        self.backend.wipe_blobs(keep_store=keep_resources)
+        # The local indexes would otherwise keep skipping (and finding) articles that no longer exist
+        self.dedup.clear()
+        self.search.clear()
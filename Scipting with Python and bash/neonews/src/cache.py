@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class DiskCache:
+    """
+    Small key/value cache: an in-process LRU in front of a SQLite table.
+    Entries survive restarts, expire after `ttl` seconds (None = never) and
+    both layers are bounded to `max_entries` (None = unbounded).
+    Values must be JSON serializable.
+    """
+    def __init__(self, path, namespace, ttl=None, max_entries=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace   TEXT NOT NULL,
+                key         TEXT NOT NULL,
+                value       TEXT NOT NULL,
+                expires_at  REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._db.commit()
+
+    def get(self, key, default=None):
+        """Returns the cached value, or `default` if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None:
+                    return default
+                entry = (row[1], json.loads(row[0]))
+                # Disk recency is only refreshed on memory misses, which keeps hits write-free
+                self._db.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key)
+                )
+                self._db.commit()
+
+            if entry[0] is not None and entry[0] <= now:
+                self._delete(key)
+                return default
+
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            self._trim_memory()
+            return entry[1]
+
+    def set(self, key, value):
+        """Stores a value and evicts the least recently used entries past the size bound."""
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            self._trim_memory()
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at, now)
+            )
+            if self.max_entries is not None:
+                self._db.execute(
+                    """
+                    DELETE FROM cache WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache WHERE namespace = ?
+                        ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.namespace, self.namespace, self.max_entries)
+                )
+            self._db.commit()
+
+    def delete(self, key):
+        """Removes a key from both layers."""
+        with self._lock:
+            self._delete(key)
+
+    def _delete(self, key):
+        self._memory.pop(key, None)
+        self._db.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+        self._db.commit()
+
+    def _trim_memory(self):
+        if self.max_entries is None:
+            return
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
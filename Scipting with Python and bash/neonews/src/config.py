@@ -4,16 +4,59 @@ from dotenv import load_dotenv
 # Load .env file
 load_dotenv()
 
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 NEWSDATA_API_KEY = os.getenv("NEWSDATA_API_KEY")
+
+# Where articles are archived: "aws" (DynamoDB & S3) or "local" (SQLite & files, no network)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "aws")
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", os.path.join(PROJECT_DIR, ".local_archive"))
+
 AWS_REGION = os.getenv("AWS_REGION")
 DYNAMODB_TABLE = os.getenv("DYNAMODB_TABLE")
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
 
+# Tuning for bulk archiving (parallel DynamoDB puts and S3 uploads)
+ARCHIVE_WORKERS = int(os.getenv("ARCHIVE_WORKERS", "8"))
+# "object": one pretty-printed JSON object per article
+# "packed": one gzip-compressed NDJSON object per topic/day and fetch run, read back with ranged GETs
+ARCHIVE_FORMAT = os.getenv("ARCHIVE_FORMAT", "object")
+# Smaller batches are stored as objects even in packed mode: a pack costs 2 PUTs (object + index)
+ARCHIVE_PACK_MIN_ARTICLES = int(os.getenv("ARCHIVE_PACK_MIN_ARTICLES", "3"))
+# Parallel delete batches / scan segments used by `db_ops --action nuke|purge`
+TEARDOWN_WORKERS = int(os.getenv("TEARDOWN_WORKERS", "8"))
+
+# Local cache (country details rarely change, keep them for a week by default)
+CACHE_DIR = os.getenv("NEONEWS_CACHE_DIR", os.path.join(PROJECT_DIR, ".cache"))
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "neonews.db")
+COUNTRY_CACHE_TTL = int(os.getenv("COUNTRY_CACHE_TTL", str(7 * 24 * 3600)))
+COUNTRY_CACHE_MAX_ENTRIES = int(os.getenv("COUNTRY_CACHE_MAX_ENTRIES", "256"))
+
+# HTTP session (keep-alive pool size and retry policy for 429/5xx)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+
+# newsdata.io quota (match it to your plan) and fan-out concurrency for `main.py fetch`
+NEWSDATA_REQUESTS_PER_MINUTE = float(os.getenv("NEWSDATA_REQUESTS_PER_MINUTE", "30"))
+NEWSDATA_BURST = int(os.getenv("NEWSDATA_BURST", "5"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+
+# `main.py watch`: seconds between polls of each feed (stretched to fit the quota), ± jitter as a
+# fraction of it, and the most articles read by a feed's first poll (later ones read down to the mark)
+WATCH_INTERVAL = float(os.getenv("WATCH_INTERVAL", "900"))
+WATCH_JITTER = float(os.getenv("WATCH_JITTER", "0.2"))
+WATCH_MAX_ITEMS = int(os.getenv("WATCH_MAX_ITEMS", "50"))
+
 if not NEWSDATA_API_KEY:
     raise ValueError("Missing NEWSDATA_API_KEY in .env file.")
-if not AWS_REGION:
+if STORAGE_BACKEND not in ("aws", "local"):
+    raise ValueError("STORAGE_BACKEND must be 'aws' or 'local'.")
+if STORAGE_BACKEND == "aws" and not AWS_REGION:
     raise ValueError("Missing AWS_REGION in .env file.")
-if not DYNAMODB_TABLE:
+if STORAGE_BACKEND == "aws" and not DYNAMODB_TABLE:
     raise ValueError("Missing DYNAMODB_TABLE in .env file.")    
-if not S3_BUCKET_NAME:
-    raise ValueError("Missing S3_BUCKET_NAME in .env file.")
\ No newline at end of file
+if STORAGE_BACKEND == "aws" and not S3_BUCKET_NAME:
+    raise ValueError("Missing S3_BUCKET_NAME in .env file.")
+if ARCHIVE_FORMAT not in ("object", "packed"):
+    raise ValueError("ARCHIVE_FORMAT must be 'object' or 'packed'.")
\ No newline at end of file
@@ -2,7 +2,6 @@ import argparse
 import sys
 from rich.console import Console
 from rich.panel import Panel
-from src.aws_handler import AWSClient
 
 console = Console()
 
@@ -89,10 +88,14 @@ def print_banner_create():
 
 def main():
     parser = argparse.ArgumentParser(description="Manage AWS Resources")
-    parser.add_argument('--action', required=True, choices=['init', 'nuke'], 
-                        help="Action to perform: 'init' (create resources) or 'nuke' (delete data)")
+    parser.add_argument('--action', required=True, choices=['init', 'nuke', 'purge'], 
+                        help="Action to perform: 'init' (create resources), 'nuke' (delete data and resources) "
+                             "or 'purge' (delete data, keep the table and bucket)")
     
     args = parser.parse_args()
+
+    # Imported after argument parsing so --help doesn't pay for boto3
+    from src.aws_handler import AWSClient
     aws = AWSClient()
 
     if args.action == 'init':
@@ -110,5 +113,13 @@ def main():
         except Exception as e:
             print(f">> Error purging resources: {e}")
 
+    elif args.action == 'purge':
+        print(">> Purging DynamoDB items and S3 objects...")
+        try:
+            aws.wipe_resources(keep_resources=True)
+            print(">> Data purged, table and bucket kept.")
+        except Exception as e:
+            print(f">> Error purging data: {e}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# SQLite caps the number of bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+
+def article_hash(article):
+    """Stable identity of an article: its link, falling back to newsdata's article_id."""
+    key = article.get('link') or article.get('article_id') or json.dumps(article, sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class DedupIndex:
+    """
+    Local SQLite index of the article hashes that are already archived.
+    Lets save_articles skip known articles without any network write.
+    `scope` identifies the archive (backend, table, bucket) the hashes belong to.
+    """
+    def __init__(self, path, scope):
+        self.scope = scope
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS archived_articles (
+                scope       TEXT NOT NULL,
+                hash        TEXT NOT NULL,
+                archived_at REAL NOT NULL,
+                PRIMARY KEY (scope, hash)
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+
+    def known(self, hashes):
+        """Returns the subset of `hashes` that is already in the index."""
+        hashes = list(hashes)
+        found = set()
+        with self._lock:
+            for start in range(0, len(hashes), QUERY_CHUNK_SIZE):
+                chunk = hashes[start:start + QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT hash FROM archived_articles WHERE scope = ? AND hash IN ({placeholders})",
+                    [self.scope] + chunk
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def add(self, hashes):
+        """Records hashes as archived."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO archived_articles (scope, hash, archived_at) VALUES (?, ?, ?)",
+                [(self.scope, digest, now) for digest in hashes]
+            )
+            self._db.commit()
+
+    def clear(self):
+        """Forgets every hash, e.g. after the archive was wiped."""
+        with self._lock:
+            self._db.execute("DELETE FROM archived_articles WHERE scope = ?", (self.scope,))
+            self._db.commit()
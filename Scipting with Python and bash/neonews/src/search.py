@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import threading
+
+# bm25 weights of the indexed columns (title, description, source, topic): a title match counts most
+COLUMN_WEIGHTS = (10.0, 1.0, 2.0, 2.0)
+
+
+def normalize_date(value):
+    """
+    newsdata.io sends "2024-05-01 13:37:00", articles without pubDate get an ISO timestamp.
+    Both are stored as "YYYY-MM-DD HH:MM:SS" so date ranges compare as plain strings.
+    """
+    return value.replace("T", " ")[:19] if value else ""
+
+
+class SearchIndex:
+    """
+    Local full-text index (SQLite FTS5) of archived articles: title, description,
+    source and topic are searchable, published_at is filterable by range.
+    Answers queries offline, without scanning the metadata table or reading blobs.
+    `scope` identifies the archive (backend, table, bucket) the articles belong to.
+    """
+    def __init__(self, path, scope):
+        self.scope = scope
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS search_articles (
+                docid        INTEGER PRIMARY KEY,
+                scope        TEXT NOT NULL,
+                article_id   TEXT NOT NULL,
+                title        TEXT,
+                description  TEXT,
+                source       TEXT,
+                topic        TEXT,
+                link         TEXT,
+                published_at TEXT,
+                s3_key       TEXT,
+                s3_range     TEXT,
+                UNIQUE (scope, article_id)
+            );
+            CREATE INDEX IF NOT EXISTS search_articles_published ON search_articles (scope, published_at);
+
+            -- External content table: the text is stored once, in search_articles
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                title, description, source, topic,
+                content='search_articles', content_rowid='docid',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS search_articles_insert AFTER INSERT ON search_articles BEGIN
+                INSERT INTO search_fts (rowid, title, description, source, topic)
+                VALUES (new.docid, new.title, new.description, new.source, new.topic);
+            END;
+            CREATE TRIGGER IF NOT EXISTS search_articles_delete AFTER DELETE ON search_articles BEGIN
+                INSERT INTO search_fts (search_fts, rowid, title, description, source, topic)
+                VALUES ('delete', old.docid, old.title, old.description, old.source, old.topic);
+            END;
+        """)
+        self._db.commit()
+
+    def add(self, entries):
+        """Indexes (item, article) pairs: the metadata item as archived plus the article it came from."""
+        rows = [
+            (
+                self.scope, item['id'], item.get('title'), article.get('description') or "",
+                item.get('source'), item.get('topic'), item.get('link'),
+                normalize_date(item.get('published_at')), item.get('s3_key'), item.get('s3_range')
+            )
+            for item, article in entries
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                """
+                INSERT OR IGNORE INTO search_articles
+                    (scope, article_id, title, description, source, topic, link, published_at, s3_key, s3_range)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            self._db.commit()
+
+    def search(self, query=None, topic=None, since=None, until=None, limit=20):
+        """
+        Returns up to `limit` articles as dicts. With a query (FTS5 syntax, e.g.
+        'climate AND title:summit') the best matches come first, without one the newest.
+        `since` / `until` are inclusive dates or timestamps ("2024-05-01", "2024-05-01 12:00").
+        """
+        filters = ["a.scope = ?"]
+        params = [self.scope]
+        if topic:
+            filters.append("a.topic = ?")
+            params.append(topic)
+        if since:
+            filters.append("a.published_at >= ?")
+            params.append(normalize_date(since))
+        if until:
+            until = normalize_date(until)
+            filters.append("a.published_at <= ?")
+            # A bare date includes the whole day
+            params.append(until + " 23:59:59" if len(until) == 10 else until)
+
+        columns = "a.article_id AS id, a.title, a.description, a.source, a.topic, a.link, a.published_at, a.s3_key, a.s3_range"
+        if query:
+            weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+            sql = f"""
+                SELECT {columns} FROM search_fts
+                JOIN search_articles a ON a.docid = search_fts.rowid
+                WHERE search_fts MATCH ? AND {" AND ".join(filters)}
+                ORDER BY bm25(search_fts, {weights}) LIMIT ?
+            """
+            params = [query] + params
+        else:
+            sql = f"""
+                SELECT {columns} FROM search_articles a
+                WHERE {" AND ".join(filters)}
+                ORDER BY a.published_at DESC LIMIT ?
+            """
+        params.append(limit)
+
+        with self._lock:
+            try:
+                rows = self._db.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search query '{query}': {e}") from e
+        return [dict(row) for row in rows]
+
+    def count(self):
+        """Number of indexed articles."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM search_articles WHERE scope = ?", (self.scope,)).fetchone()[0]
+
+    def clear(self):
+        """Forgets every article, e.g. before a rebuild or after the archive was wiped."""
+        with self._lock:
+            self._db.execute("DELETE FROM search_articles WHERE scope = ?", (self.scope,))
+            self._db.commit()
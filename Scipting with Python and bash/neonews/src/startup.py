@@ -0,0 +1,113 @@
+import io
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Taken as early as possible: main.py imports this module before anything heavy
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """Collects (label, seconds) timings of startup phases, from any thread."""
+    def __init__(self):
+        self.timings = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, time.perf_counter() - start)
+
+    def record(self, label, seconds):
+        with self._lock:
+            self.timings.append((label, seconds))
+
+    def mark(self, label):
+        """Records the time elapsed since the process started."""
+        self.record(label, time.perf_counter() - PROCESS_START)
+
+
+class _ThreadOutput:
+    """
+    Stands in for sys.stdout: writes from threads with a buffer go to that buffer, every other
+    thread (the prompt, rich's refresh thread) writes to the real stream as before.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffers = {}  # thread ident -> StringIO
+
+    def write(self, text):
+        buffer = self.buffers.get(threading.get_ident())
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        if threading.get_ident() not in self.buffers:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_output_lock = threading.Lock()
+
+
+@contextmanager
+def _captured_output():
+    """Collects what the current thread prints, without touching the output of other threads."""
+    buffer = io.StringIO()
+    with _output_lock:
+        if not isinstance(sys.stdout, _ThreadOutput):
+            sys.stdout = _ThreadOutput(sys.stdout)
+        router = sys.stdout
+        router.buffers[threading.get_ident()] = buffer
+    try:
+        yield buffer
+    finally:
+        with _output_lock:
+            del router.buffers[threading.get_ident()]
+            # Only undone if nobody replaced it meanwhile; a prompt holding on to it keeps working
+            if not router.buffers and sys.stdout is router:
+                sys.stdout = router.stream
+
+
+class BackgroundTask:
+    """
+    Runs a function on a daemon thread; wait() re-raises its error in the caller.
+    With capture_output, whatever the function prints is held back in `output` instead of
+    interrupting the foreground (e.g. an open questionary menu), to be shown after wait().
+    """
+    def __init__(self, target, name, capture_output=False):
+        self._target = target
+        self._error = None
+        self._capture_output = capture_output
+        self.output = ""
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            if self._capture_output:
+                with _captured_output() as buffer:
+                    try:
+                        self._target()
+                    finally:
+                        self.output = buffer.getvalue()
+            else:
+                self._target()
+        except BaseException as e:
+            self._error = e
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def wait(self):
+        self._thread.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,65 @@
+import os
+from src.config import STORAGE_BACKEND, LOCAL_STORAGE_DIR, AWS_REGION, DYNAMODB_TABLE, S3_BUCKET_NAME
+
+
+class StorageBackend:
+    """
+    Where AWSClient archives articles: a metadata table (one item per article,
+    keyed by 'id') and a blob store for the article bodies.
+    Methods raise on errors; AWSClient decides how to report them.
+    """
+    # Human readable names, used in CLI and error messages
+    description = ""
+    items_label = ""
+    blobs_label = ""
+    # Identifies the archive location, so local indexes are never shared between backends
+    scope = ""
+
+    def init_resources(self):
+        """Creates the metadata table and blob store if they don't exist."""
+        raise NotImplementedError
+
+    def put_item_if_absent(self, item):
+        """Writes an item unless one with the same id exists. Returns False for an existing id."""
+        raise NotImplementedError
+
+    def delete_item(self, item_id):
+        raise NotImplementedError
+
+    def put_blob(self, key, body, content_type):
+        raise NotImplementedError
+
+    def get_blob(self, key, byte_range=None):
+        """Returns the blob's bytes, or only the "bytes=start-end" range of it."""
+        raise NotImplementedError
+
+    def list_blobs(self, prefix=""):
+        """Yields the key of every blob, page by page."""
+        raise NotImplementedError
+
+    def wipe_items(self, keep_table=False):
+        """Deletes every item; drops the table itself unless keep_table is set."""
+        raise NotImplementedError
+
+    def wipe_blobs(self, keep_store=False):
+        """Deletes every blob; drops the store itself unless keep_store is set."""
+        raise NotImplementedError
+
+
+def archive_scope(name=STORAGE_BACKEND):
+    """
+    The `scope` of the configured backend without building it, so read-only commands
+    (e.g. `main.py search`) can open the local indexes without importing boto3.
+    """
+    if name == "local":
+        return f"local:{os.path.abspath(LOCAL_STORAGE_DIR)}"
+    return f"aws:{AWS_REGION}:{DYNAMODB_TABLE}:{S3_BUCKET_NAME}"
+
+
+def create_backend(name=STORAGE_BACKEND):
+    """Builds the configured backend. Imports are deferred so the local backend never loads boto3."""
+    if name == "local":
+        from src.storage_local import LocalBackend
+        return LocalBackend()
+    from src.storage_aws import AWSBackend
+    return AWSBackend()
@@ -0,0 +1,227 @@
+import boto3
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from botocore.exceptions import ClientError
+from src.config import AWS_REGION, DYNAMODB_TABLE, S3_BUCKET_NAME, TEARDOWN_WORKERS
+from src.storage import StorageBackend, archive_scope
+
+S3_DELETE_BATCH_SIZE = 1000  # Hard limit of DeleteObjects
+
+class AWSBackend(StorageBackend):
+    """Metadata in a DynamoDB table, article bodies in an S3 bucket."""
+    description = "AWS DynamoDB & S3"
+    items_label = "DynamoDB"
+    blobs_label = "S3"
+
+    def __init__(self):
+        self.dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
+        self.s3 = boto3.client('s3', region_name=AWS_REGION)
+        # The resource's client accepts plain Python types and, unlike the resource, is thread-safe
+        self.client = self.dynamodb.meta.client
+        self.scope = archive_scope("aws")
+
+    def init_resources(self):
+        """Checks if Table and Bucket exist, creates them if not."""
+        # 1. Check/Create DynamoDB
+        try:
+            table = self.dynamodb.Table(DYNAMODB_TABLE)
+            table.load()
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                print(f"⏳ Creating DynamoDB Table: {DYNAMODB_TABLE}...")
+                try:
+                    table = self.dynamodb.create_table(
+                        TableName=DYNAMODB_TABLE,
+                        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+                        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+                        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+                    )
+                    print("Waiting for table to become ACTIVE...")
+                    table.wait_until_exists()
+                    print(f"✅ Table '{DYNAMODB_TABLE}' is now ACTIVE.")
+                except Exception as ce:
+                    print(f"❌ DynamoDB Table creation failed: {ce}")
+
+        # 2. Check/Create S3
+        if S3_BUCKET_NAME:
+            try:
+                self.s3.head_bucket(Bucket=S3_BUCKET_NAME)
+            except ClientError:
+                print(f"⏳ Creating S3 Bucket: {S3_BUCKET_NAME}...")
+                try:
+                    self.s3.create_bucket(
+                        Bucket=S3_BUCKET_NAME,
+                        CreateBucketConfiguration={
+                            'LocationConstraint': AWS_REGION
+                        }
+                    )
+                    print(f"✅ Bucket '{S3_BUCKET_NAME}' created successfully.")
+                except Exception as e:
+                    print(f"❌ S3 Creation Failed: {e}")
+
+    def put_item_if_absent(self, item):
+        try:
+            self.client.put_item(
+                TableName=DYNAMODB_TABLE,
+                Item=item,
+                ConditionExpression='attribute_not_exists(id)'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
+
+    def delete_item(self, item_id):
+        self.client.delete_item(TableName=DYNAMODB_TABLE, Key={'id': item_id})
+
+    def put_blob(self, key, body, content_type):
+        self.s3.put_object(Bucket=S3_BUCKET_NAME, Key=key, Body=body, ContentType=content_type)
+
+    def get_blob(self, key, byte_range=None):
+        if byte_range:
+            response = self.s3.get_object(Bucket=S3_BUCKET_NAME, Key=key, Range=byte_range)
+        else:
+            response = self.s3.get_object(Bucket=S3_BUCKET_NAME, Key=key)
+        return response['Body'].read()
+
+    def list_blobs(self, prefix=""):
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=S3_BUCKET_NAME, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def wipe_items(self, keep_table=False):
+        if keep_table:
+            self._purge_dynamodb()
+        else:
+            self._nuke_dynamodb()
+
+    def wipe_blobs(self, keep_store=False):
+        self._nuke_s3(keep_bucket=keep_store)
+
+    def _nuke_dynamodb(self):
+        """Delete the DynamoDB table and wait for confirmation."""
+        try:
+            table = self.dynamodb.Table(DYNAMODB_TABLE)
+            table.delete()
+            print(f"⏳ Waiting for table '{DYNAMODB_TABLE}' to be deleted...")
+            table.wait_until_not_exists()
+            print(f"✅ Table '{DYNAMODB_TABLE}' deleted.")
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                print(f"✅ Table '{DYNAMODB_TABLE}' already gone.")
+            else:
+                print(f"❌ Error deleting table: {e}")
+
+    def _purge_dynamodb(self):
+        """Delete every item but keep the table: parallel segmented Scan feeding batch deletes."""
+        print(f"⏳ Purging items from table '{DYNAMODB_TABLE}' ({TEARDOWN_WORKERS} segments)...")
+        with ThreadPoolExecutor(max_workers=TEARDOWN_WORKERS) as pool:
+            results = list(pool.map(self._purge_segment, range(TEARDOWN_WORKERS)))
+
+        deleted = sum(count for count, _ in results)
+        errors = [error for _, error in results if error]
+        if errors:
+            print(f"❌ Deleted {deleted} items, {len(errors)} segments failed: {errors[0]}")
+        else:
+            print(f"✅ Deleted {deleted} items from '{DYNAMODB_TABLE}'.")
+
+    def _purge_segment(self, segment):
+        """Scans one segment (keys only) and deletes what it finds. Returns (deleted, error)."""
+        paginator = self.dynamodb.meta.client.get_paginator('scan')
+        # batch_writer buffers per instance, so every thread gets its own Table handle
+        table = self.dynamodb.Table(DYNAMODB_TABLE)
+        deleted = 0
+        try:
+            with table.batch_writer() as batch:
+                for page in paginator.paginate(
+                    TableName=DYNAMODB_TABLE,
+                    Segment=segment,
+                    TotalSegments=TEARDOWN_WORKERS,
+                    ProjectionExpression='id'
+                ):
+                    for item in page.get('Items', []):
+                        batch.delete_item(Key={'id': item['id']})
+                        deleted += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                return deleted, None
+            return deleted, str(e)
+        return deleted, None
+
+    def _nuke_s3(self, keep_bucket=False):
+        """Empty (every object version and delete marker) and delete the S3 bucket."""
+        if not S3_BUCKET_NAME:
+            return
+
+        print(f"⏳ Emptying bucket '{S3_BUCKET_NAME}'...")
+        try:
+            deleted, errors = self._empty_bucket()
+            if errors:
+                first = errors[0]
+                print(f"❌ Deleted {deleted} objects, {len(errors)} failed (e.g. {first['Key']}: {first['Message']})")
+                return
+            print(f"✅ Deleted {deleted} objects from '{S3_BUCKET_NAME}'.")
+
+            if keep_bucket:
+                return
+
+            # Delete the bucket itself
+            self.s3.delete_bucket(Bucket=S3_BUCKET_NAME)
+            
+            # Wait until it's actually gone
+            waiter = self.s3.get_waiter('bucket_not_exists')
+            waiter.wait(Bucket=S3_BUCKET_NAME)
+            print(f"✅ Bucket '{S3_BUCKET_NAME}' deleted.")
+
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchBucket':
+                print(f"✅ Bucket '{S3_BUCKET_NAME}' already gone.")
+            else:
+                print(f"❌ Error deleting S3: {e}")
+
+    def _empty_bucket(self):
+        """
+        Lists every object version page by page while delete_objects batches run
+        concurrently. Returns (deleted count, per-key errors).
+        """
+        paginator = self.s3.get_paginator('list_object_versions')
+        totals = {'deleted': 0, 'errors': []}
+
+        def collect(done):
+            for future in done:
+                deleted, errors = future.result()
+                totals['deleted'] += deleted
+                totals['errors'].extend(errors)
+            print(f"   - Deleted {totals['deleted']} objects so far")
+
+        with ThreadPoolExecutor(max_workers=TEARDOWN_WORKERS) as pool:
+            in_flight = set()
+            for page in paginator.paginate(Bucket=S3_BUCKET_NAME):
+                objects = [
+                    {'Key': version['Key'], 'VersionId': version['VersionId']}
+                    for version in page.get('Versions', []) + page.get('DeleteMarkers', [])
+                ]
+                for start in range(0, len(objects), S3_DELETE_BATCH_SIZE):
+                    in_flight.add(pool.submit(self._delete_batch, objects[start:start + S3_DELETE_BATCH_SIZE]))
+                    # Keep listing, but don't let queued batches pile up in memory
+                    if len(in_flight) >= TEARDOWN_WORKERS * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+            if in_flight:
+                collect(wait(in_flight).done)
+
+        return totals['deleted'], totals['errors']
+
+    def _delete_batch(self, objects):
+        """Deletes up to 1000 object versions. Returns (deleted count, per-key errors)."""
+        try:
+            response = self.s3.delete_objects(
+                Bucket=S3_BUCKET_NAME,
+                Delete={'Objects': objects, 'Quiet': True}
+            )
+        except ClientError as e:
+            message = e.response['Error'].get('Message', str(e))
+            return 0, [{'Key': obj['Key'], 'Message': message} for obj in objects]
+        errors = response.get('Errors', [])
+        return len(objects) - len(errors), errors
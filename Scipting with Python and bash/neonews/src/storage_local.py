@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from src.config import LOCAL_STORAGE_DIR
+from src.storage import StorageBackend
+
+
+class LocalBackend(StorageBackend):
+    """
+    Zero-network backend: metadata in a SQLite table, article bodies as files
+    under LOCAL_STORAGE_DIR. Lets the archive path run (and be measured) on a laptop.
+    """
+    description = "local SQLite & filesystem"
+    items_label = "SQLite"
+    blobs_label = "Blob store"
+
+    def __init__(self, root=LOCAL_STORAGE_DIR):
+        self.root = os.path.abspath(root)
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.db_path = os.path.join(self.root, "metadata.db")
+        self.scope = f"local:{self.root}"
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    id   TEXT PRIMARY KEY,
+                    item TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self._db.commit()
+        return self._db
+
+    def init_resources(self):
+        with self._lock:
+            self._connect()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        print(f"✅ Local archive ready in '{self.root}'.")
+
+    def put_item_if_absent(self, item):
+        with self._lock:
+            db = self._connect()
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO articles (id, item) VALUES (?, ?)",
+                (item['id'], json.dumps(item))
+            )
+            db.commit()
+            return cursor.rowcount == 1
+
+    def delete_item(self, item_id):
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM articles WHERE id = ?", (item_id,))
+            db.commit()
+
+    def put_blob(self, key, body, content_type):
+        path = self._blob_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        # Write then rename, so readers never see a half-written blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def get_blob(self, key, byte_range=None):
+        with open(self._blob_path(key), "rb") as f:
+            if not byte_range:
+                return f.read()
+            start, end = (int(part) for part in byte_range.split("=", 1)[1].split("-"))
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def list_blobs(self, prefix=""):
+        for directory, dirnames, filenames in os.walk(self.blob_dir):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.startswith(".tmp-"):
+                    continue
+                key = os.path.relpath(os.path.join(directory, filename), self.blob_dir).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    yield key
+
+    def wipe_items(self, keep_table=False):
+        with self._lock:
+            if keep_table:
+                db = self._connect()
+                deleted = db.execute("DELETE FROM articles").rowcount
+                db.commit()
+                print(f"✅ Deleted {deleted} items from '{self.db_path}'.")
+                return
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.db_path + suffix):
+                    os.remove(self.db_path + suffix)
+            print(f"✅ Metadata database '{self.db_path}' deleted.")
+
+    def wipe_blobs(self, keep_store=False):
+        shutil.rmtree(self.blob_dir, ignore_errors=True)
+        if keep_store:
+            os.makedirs(self.blob_dir, exist_ok=True)
+            print(f"✅ Blob store '{self.blob_dir}' emptied.")
+        else:
+            print(f"✅ Blob store '{self.blob_dir}' deleted.")
+
+    def _blob_path(self, key):
+        path = os.path.abspath(os.path.join(self.blob_dir, key))
+        if not path.startswith(self.blob_dir + os.sep):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
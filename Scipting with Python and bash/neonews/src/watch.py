@@ -0,0 +1,119 @@
+import heapq
+import random
+import threading
+import time
+from src.archive import FAILED
+from src.cache import DiskCache
+from src.config import CACHE_DB_PATH, NEWSDATA_REQUESTS_PER_MINUTE, WATCH_INTERVAL, WATCH_JITTER, WATCH_MAX_ITEMS
+from src.dedup import article_hash
+from src.search import normalize_date
+
+# Ids remembered at the high-water mark's timestamp (articles published in the same second)
+MARK_MAX_IDS = 100
+
+
+def article_key(article):
+    """newsdata.io's article_id, or the content hash for articles without one."""
+    return article.get('article_id') or article_hash(article)
+
+
+class FeedWatcher:
+    """
+    Polls (country_code, topic, language) feeds on a schedule and archives only new articles.
+    Every feed keeps a persisted high-water mark: the newest pubDate seen and the ids published
+    at that instant. newsdata.io lists the newest articles first, so a poll stops reading (and
+    paging) at the first article that is already behind the mark. `max_items` only caps a
+    feed's first poll: later ones page down to the mark, however many articles came out since,
+    so none of them is skipped.
+    """
+    def __init__(self, api, aws, feeds, interval=WATCH_INTERVAL, jitter=WATCH_JITTER, max_items=WATCH_MAX_ITEMS):
+        self.api = api
+        self.aws = aws
+        self.feeds = list(feeds)
+        self.jitter = jitter
+        self.max_items = max_items
+        # One first-page request per feed and interval must fit in the quota, whatever was asked for
+        self.interval = max(interval, len(self.feeds) * 60.0 / NEWSDATA_REQUESTS_PER_MINUTE)
+        self.marks = DiskCache(CACHE_DB_PATH, namespace="watch_marks")
+        self.stopped = threading.Event()
+        self._random = random.Random()
+
+    def poll(self, feed):
+        """
+        Reads a feed down to its high-water mark and archives what is new.
+        Returns (new articles, archive statuses). The mark only moves once the poll has read all
+        the way down to it (or to the end of the feed) and every new article is archived.
+        """
+        country_code, topic, language = feed
+        key = f"{country_code}:{topic}:{language}"
+        mark = self.marks.get(key)
+
+        # Without a mark there's nothing to catch up with: start from the newest max_items
+        pages = self.api.iter_news(country_code, topic, language, max_items=None if mark else self.max_items)
+        articles = []
+        complete = False
+        while True:
+            try:
+                article = next(pages)
+            except StopIteration as stop:
+                # False when a page couldn't be fetched: what's behind it is still unread
+                complete = stop.value is not False
+                break
+            if mark and self._is_seen(article, mark):
+                complete = True
+                break
+            articles.append(article)
+
+        results = self.aws.save_articles(articles, topic) if articles else []
+        # After a failure the next poll reads the same articles again; the dedup index skips the saved ones
+        if articles and complete and FAILED not in results:
+            self.marks.set(key, self._advance(mark, articles))
+        return articles, results
+
+    def poll_all(self):
+        """Polls every feed once, e.g. from cron. Yields (feed, new articles, statuses)."""
+        for feed in self.feeds:
+            if self.stopped.is_set():
+                return
+            yield (feed, *self.poll(feed))
+
+    def run(self):
+        """
+        Polls every feed once per interval until stop() is called, yielding (feed, new articles, statuses).
+        First polls are spread evenly over one interval and every later one is shifted by up to
+        ±jitter of the interval, so feeds never line up into bursts against the quota.
+        """
+        step = self.interval / len(self.feeds)
+        start = time.monotonic()
+        schedule = [(start + idx * step, idx, feed) for idx, feed in enumerate(self.feeds)]
+        heapq.heapify(schedule)
+
+        while not self.stopped.is_set():
+            due, idx, feed = schedule[0]
+            if self.stopped.wait(max(0.0, due - time.monotonic())):
+                return
+            yield (feed, *self.poll(feed))
+
+            # Next poll relative to the planned one, so slow polls don't make the schedule drift
+            spread = self._random.uniform(-self.jitter, self.jitter)
+            next_due = max(due + self.interval * (1 + spread), time.monotonic())
+            heapq.heapreplace(schedule, (next_due, idx, feed))
+
+    def stop(self):
+        self.stopped.set()
+
+    def _is_seen(self, article, mark):
+        if article_key(article) in mark['ids']:
+            return True
+        published = normalize_date(article.get('pubDate'))
+        return bool(published) and published < mark['published_at']
+
+    def _advance(self, mark, articles):
+        """The mark after archiving `articles`: their newest pubDate and every id published at it."""
+        newest = max(
+            [normalize_date(article.get('pubDate')) for article in articles] + ([mark['published_at']] if mark else [])
+        )
+        ids = [article_key(article) for article in articles if normalize_date(article.get('pubDate')) == newest]
+        if mark and mark['published_at'] == newest:
+            ids += [article_id for article_id in mark['ids'] if article_id not in ids]
+        return {'published_at': newest, 'ids': ids[:MARK_MAX_IDS]}
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+import requests
+
+# src/config.py reads the environment at import: point it at throwaway locations first
+os.environ["NEWSDATA_API_KEY"] = "test"
+os.environ["NEONEWS_CACHE_DIR"] = tempfile.mkdtemp(prefix="neonews-tests-")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["LOCAL_STORAGE_DIR"] = os.path.join(os.environ["NEONEWS_CACHE_DIR"], "archive")
+os.environ["NEWSDATA_REQUESTS_PER_MINUTE"] = "1000000"
+os.environ["NEWSDATA_BURST"] = "1000"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _Raw:
+    retries = None
+
+
+class FakeNewsSession:
+    """
+    Stands in for requests.Session: serves newsdata.io pages of `per_page` articles
+    (newest first, ids a0, a1, ...) chained by nextPage cursors "p1", "p2", ...
+    Pages listed in `failing` answer with a 503.
+    """
+    def __init__(self, articles, per_page=10, failing=()):
+        self.pages = [articles[start:start + per_page] for start in range(0, len(articles), per_page)]
+        self.failing = set(failing)
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.requests.append(dict(params or {}))
+        number = int(params.get("page", "p0")[1:])
+        body = {
+            "status": "success",
+            "results": self.pages[number] if number < len(self.pages) else [],
+            "nextPage": f"p{number + 1}" if number + 1 < len(self.pages) else None
+        }
+        response = requests.Response()
+        response.status_code = 503 if number in self.failing else 200
+        response.raw = _Raw()
+        response._content = json.dumps(body).encode()
+        return response
+
+
+def make_articles(count, start=0):
+    """Articles a{start}..., newest first, one minute apart."""
+    return [
+        {
+            "article_id": f"a{idx}",
+            "title": f"Story {idx}",
+            "link": f"https://example.com/{idx}",
+            "pubDate": f"2024-05-01 12:{59 - idx:02d}:00"
+        }
+        for idx in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def api():
+    from src.api import ApiClient
+    from src.cache import DiskCache
+    from src.config import CACHE_DB_PATH
+    client = ApiClient()
+    # Every test starts without saved cursors
+    client.news_cursors = DiskCache(CACHE_DB_PATH, namespace=f"news_cursors-{uuid.uuid4().hex}")
+    return client
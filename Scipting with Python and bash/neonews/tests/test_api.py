@@ -0,0 +1,83 @@
+import itertools
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from conftest import FakeNewsSession, make_articles
+
+FEED = ("ro", "technology", "en")
+
+
+def ids(articles):
+    return [article["article_id"] for article in articles]
+
+
+def test_resumed_runs_continue_where_the_previous_one_stopped(api):
+    api.session = FakeNewsSession(make_articles(30))
+
+    first = list(api.iter_news(*FEED, max_items=5, resume=True))
+    second = list(api.iter_news(*FEED, max_items=5, resume=True))
+
+    assert ids(first) == [f"a{idx}" for idx in range(0, 5)]
+    assert ids(second) == [f"a{idx}" for idx in range(5, 10)]
+
+
+def test_resume_moves_past_a_fully_read_page(api):
+    api.session = FakeNewsSession(make_articles(30))
+
+    first = list(api.iter_news(*FEED, max_items=15, resume=True))
+    second = list(api.iter_news(*FEED, max_items=15, resume=True))
+
+    assert ids(first) == [f"a{idx}" for idx in range(0, 15)]
+    assert ids(second) == [f"a{idx}" for idx in range(15, 30)]
+
+
+def test_stopping_on_the_last_article_of_a_page_saves_the_next_page(api):
+    api.session = FakeNewsSession(make_articles(30))
+
+    list(api.iter_news(*FEED, max_items=10, resume=True))
+
+    assert api.news_cursors.get(":".join(FEED)) == {"page": "p1", "offset": 0}
+    assert ids(api.iter_news(*FEED, max_items=2, resume=True)) == ["a10", "a11"]
+    assert len(api.session.requests) == 2
+
+
+def test_resume_starts_over_after_the_last_page(api):
+    api.session = FakeNewsSession(make_articles(12))
+
+    assert ids(api.iter_news(*FEED, resume=True)) == [f"a{idx}" for idx in range(12)]
+    assert api.news_cursors.get(":".join(FEED)) is None
+    assert ids(api.iter_news(*FEED, max_items=3, resume=True)) == ["a0", "a1", "a2"]
+
+
+def test_islice_without_max_items_does_not_touch_the_cursor(api):
+    api.session = FakeNewsSession(make_articles(30))
+
+    assert ids(itertools.islice(api.iter_news(*FEED), 5)) == [f"a{idx}" for idx in range(5)]
+    assert api.news_cursors.get(":".join(FEED)) is None
+
+
+class UnreachableSession:
+    """Fails like requests does once urllib3 has used up its retries on a dead host."""
+    def get(self, url, **kwargs):
+        raise requests.ConnectionError(MaxRetryError(None, url, NewConnectionError(None, "Connection refused")))
+
+
+class TimeoutSession:
+    """Fails without any retry, e.g. a read timeout urllib3 doesn't retry."""
+    def get(self, url, **kwargs):
+        raise requests.ReadTimeout("read timed out")
+
+
+def test_retries_before_a_failed_request_are_counted(api):
+    from src.config import HTTP_MAX_RETRIES
+    api.session = UnreachableSession()
+
+    assert api._get_json("https://restcountries.com/v3.1/name/x") is None
+    assert api._stats["retries"] == HTTP_MAX_RETRIES
+    assert api._stats["errors"] == 1
+
+    api.session = TimeoutSession()
+    assert api._get_json("https://restcountries.com/v3.1/name/x") is None
+    assert api._stats["retries"] == HTTP_MAX_RETRIES
+    assert api._stats["errors"] == 2
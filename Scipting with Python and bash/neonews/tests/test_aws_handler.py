@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+
+from conftest import make_articles
+from src import aws_handler
+from src.archive import INDEX_EXTENSION, PACKED_EXTENSION, SAVED
+
+
+class CountingBackend:
+    """Wraps a storage backend and counts blob PUTs."""
+    def __init__(self, backend):
+        self.backend = backend
+        self.blob_puts = []
+
+    def put_blob(self, key, body, content_type):
+        self.blob_puts.append(key)
+        return self.backend.put_blob(key, body, content_type)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+@pytest.fixture
+def packed_client(tmp_path, monkeypatch):
+    from src.storage_local import LocalBackend
+    monkeypatch.setattr(aws_handler, "ARCHIVE_FORMAT", "packed")
+    backend = CountingBackend(LocalBackend(root=str(tmp_path)))
+    client = aws_handler.AWSClient(backend=backend)
+    client.init_resources()
+    client.dedup.clear()
+    client.search.clear()
+    return client
+
+
+def unique_articles(count):
+    # Content hashes are global to the cache database: keep them apart from other tests
+    run = uuid.uuid4().hex
+    return [dict(article, link=f"{article['link']}?{run}") for article in make_articles(count)]
+
+
+def test_small_batches_are_stored_as_objects(packed_client):
+    # A typical watch poll: 2 new articles are 2 PUTs, not a pack plus its index
+    assert packed_client.save_articles(unique_articles(2), "technology") == [SAVED, SAVED]
+    assert len(packed_client.backend.blob_puts) == 2
+    assert not any(key.endswith(PACKED_EXTENSION) for key in packed_client.backend.blob_puts)
+
+
+def test_larger_batches_are_packed_in_two_puts(packed_client):
+    articles = unique_articles(10)
+    assert packed_client.save_articles(articles, "technology") == [SAVED] * 10
+
+    keys = packed_client.backend.blob_puts
+    assert len(keys) == 2
+    assert keys[0].endswith(PACKED_EXTENSION) and keys[1] == keys[0] + INDEX_EXTENSION
@@ -0,0 +1,54 @@
+import uuid
+
+from conftest import FakeNewsSession, make_articles
+from src.archive import SAVED
+
+
+class RecordingArchive:
+    """Stands in for AWSClient: remembers every article it was asked to save."""
+    def __init__(self):
+        self.saved = []
+
+    def save_articles(self, articles, topic):
+        self.saved.extend(article["article_id"] for article in articles)
+        return [SAVED] * len(articles)
+
+
+def make_watcher(api, max_items):
+    from src.watch import FeedWatcher
+    # A feed of its own, so marks left by other tests don't apply
+    feed = (f"x{uuid.uuid4().hex[:6]}", "technology", "en")
+    return FeedWatcher(api, RecordingArchive(), [feed], interval=60, jitter=0, max_items=max_items), feed
+
+
+def test_more_new_articles_than_max_items_are_all_archived(api):
+    watcher, feed = make_watcher(api, max_items=3)
+    api.session = FakeNewsSession(make_articles(3, start=7), per_page=2)
+    watcher.poll(feed)
+    assert watcher.aws.saved == ["a7", "a8", "a9"]
+
+    # Seven articles came out since: more than max_items, over several pages
+    api.session = FakeNewsSession(make_articles(10), per_page=2)
+    articles, _ = watcher.poll(feed)
+
+    assert [article["article_id"] for article in articles] == [f"a{idx}" for idx in range(7)]
+    assert watcher.aws.saved[3:] == [f"a{idx}" for idx in range(7)]
+    # The next poll has nothing new left
+    assert watcher.poll(feed) == ([], [])
+
+
+def test_mark_stays_put_when_a_page_fails_before_reaching_it(api):
+    watcher, feed = make_watcher(api, max_items=3)
+    api.session = FakeNewsSession(make_articles(3, start=7), per_page=2)
+    watcher.poll(feed)
+    mark = watcher.marks.get(":".join(feed))
+
+    # The page with a4 and a5 can't be fetched
+    api.session = FakeNewsSession(make_articles(10), per_page=2, failing={2})
+    watcher.poll(feed)
+    assert watcher.marks.get(":".join(feed)) == mark
+
+    api.session = FakeNewsSession(make_articles(10), per_page=2)
+    articles, _ = watcher.poll(feed)
+    assert [article["article_id"] for article in articles] == [f"a{idx}" for idx in range(7)]
+    assert watcher.marks.get(":".join(feed))["ids"] == ["a0"]
@@ -0,0 +1,161 @@
+"""
+Cold vs warm invocation times of every handler, run locally against the in-memory fakes.
+
+    python bench/coldstart.py [--runs 5] [--warm 50] [--handlers getTodos,processTodo]
+
+Every run starts a fresh Python process (a new "container") that:
+  1. imports the handler module                     -> import_ms (the Lambda init phase)
+  2. creates the real boto3 clients it will use     -> client_create_ms (service model loading, no AWS calls)
+  3. invokes the handler once, then --warm times    -> cold_invoke_ms / warm_invoke_ms
+processTodo's messages carry idempotency keys like the ones the API sends (conditional
+PutItem path); processTodoLegacy's don't (batch_write_item path, for messages queued before keys).
+getTodos gets a different query every time, so warm_invoke_ms are cache misses that read the
+table; each one is repeated right away with the same query and timed as cache_hit_ms.
+Prints one JSON document, so results can be compared between changes.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from bench import fakes
+from bench.stats import summarize
+
+# name -> (module, function, what it gets from src.runtime)
+HANDLERS = {
+    'addTodo': ('src.createTodo', 'createTodo', [('client', 'sqs')]),
+    'addTodos': ('src.createTodo', 'createTodos', [('client', 'sqs')]),
+    'getTodos': ('src.getTodo', 'getTodos', [('table', fakes.TABLE_NAME)]),
+    'processTodo': ('src.processTodo', 'handler', [('table', fakes.TABLE_NAME)]),
+    # Messages without an idempotency key, queued before keys existed: batch_write_item path
+    'processTodoLegacy': ('src.processTodo', 'handler', [('table', fakes.TABLE_NAME)]),
+    'reDriveDLQ': ('src.reDriveDLQ', 'handler', [('client', 'sqs')])
+}
+SEEDED_TODOS = 500
+
+def make_event(name, sqs, idx):
+    if name == 'addTodo':
+        return {'body': json.dumps({'task': f"Bench todo {idx}"}), 'headers': {}}
+    if name == 'addTodos':
+        return {'body': json.dumps([{'task': f"Bench todo {idx}-{n}"} for n in range(100)]), 'headers': {}}
+    if name == 'getTodos':
+        # Every parameter is part of getTodos' cache key, so a new nonce is always a miss
+        return {'queryStringParameters': {'limit': '50', 'nonce': str(idx)}}
+    if name in ('processTodo', 'processTodoLegacy'):
+        # Like addTodo/addTodos send them: with a key, so they go through the conditional puts
+        keyed = name == 'processTodo'
+        sqs.send_message_batch(QueueUrl=fakes.QUEUE_URL, Entries=[
+            {'Id': str(n), 'MessageBody': json.dumps(
+                {'task': f"Bench todo {idx}-{n}", **({'idempotency_key': f"bench-{idx}-{n}"} if keyed else {})}
+            )} for n in range(10)
+        ])
+        return fakes.to_sqs_event(sqs.receive_message(QueueUrl=fakes.QUEUE_URL, MaxNumberOfMessages=10)['Messages'])
+    if name == 'reDriveDLQ':
+        sqs.send_message_batch(QueueUrl=fakes.DLQ_URL, Entries=[
+            {'Id': str(n), 'MessageBody': json.dumps({'task': f"Bench todo {idx}-{n}"})} for n in range(10)
+        ])
+        return {}
+    raise ValueError(name)
+
+def child(name, warm):
+    """Runs inside the fresh process; prints its timings as one JSON line."""
+    module_name, function_name, services = HANDLERS[name]
+    # The handlers log every call; keep that out of the JSON on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_ms = (time.perf_counter() - start) * 1000
+
+        from src import runtime
+        start = time.perf_counter()
+        for kind, service in services:
+            getattr(runtime, kind)(service)
+        client_ms = (time.perf_counter() - start) * 1000
+
+        sqs, db = fakes.install()
+        fakes.seed_todos(db, fakes.TABLE_NAME, SEEDED_TODOS)
+        handler = getattr(module, function_name)
+        timings = []
+        hits = []
+        for idx in range(warm + 1):
+            event = make_event(name, sqs, idx)
+            start = time.perf_counter()
+            response = handler(event, None)
+            ms = (time.perf_counter() - start) * 1000
+            if cache_status(response) == 'HIT':
+                raise RuntimeError(f"{name} invocation {idx} was served from the cache")
+            timings.append(ms)
+
+            if cache_status(response) and idx:
+                start = time.perf_counter()
+                response = handler(event, None)
+                ms = (time.perf_counter() - start) * 1000
+                if cache_status(response) != 'HIT':
+                    raise RuntimeError(f"{name} repeated invocation {idx} missed the cache")
+                hits.append(ms)
+
+    print(json.dumps({'import_ms': import_ms, 'client_create_ms': client_ms, 'invocations_ms': timings, 'cache_hits_ms': hits}))
+
+def cache_status(response):
+    """X-Cache of an API Gateway response, None for handlers without a cache."""
+    if not isinstance(response, dict):
+        return None
+    return (response.get('headers') or {}).get('X-Cache')
+
+def run_child(name, warm):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', name, '--warm', str(warm)],
+        env={**os.environ, **fakes.ENV}, cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_ms'] = process_ms
+    return timings
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cold and warm invocation times of the todo handlers")
+    parser.add_argument('--runs', type=int, default=5, help="fresh processes (cold starts) per handler")
+    parser.add_argument('--warm', type=int, default=50, help="warm invocations after each cold start")
+    parser.add_argument('--handlers', default=','.join(HANDLERS), help="comma separated subset of handlers")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.child:
+        child(args.child, args.warm)
+        return
+
+    results = {}
+    for name in args.handlers.split(','):
+        runs = [run_child(name, args.warm) for _ in range(args.runs)]
+        results[name] = {
+            'process_ms': round(statistics.median(run['process_ms'] for run in runs), 3),
+            'import_ms': round(statistics.median(run['import_ms'] for run in runs), 3),
+            'client_create_ms': round(statistics.median(run['client_create_ms'] for run in runs), 3),
+            'cold_invoke_ms': round(statistics.median(run['invocations_ms'][0] for run in runs), 3),
+            'warm_invoke_ms': summarize([ms for run in runs for ms in run['invocations_ms'][1:]])
+        }
+        hits = [ms for run in runs for ms in run['cache_hits_ms']]
+        if hits:
+            results[name]['cache_hit_ms'] = summarize(hits)
+
+    print(json.dumps({
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'warm': args.warm,
+        'handlers': results
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
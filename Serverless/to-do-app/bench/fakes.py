@@ -0,0 +1,416 @@
+"""
+In-memory stand-ins for the SQS client and the DynamoDB resource, covering only the calls the
+handlers make. Installed with runtime.register(), so the handlers run unchanged and offline.
+`latency` (seconds) is slept on every call to mimic the network round trip.
+"""
+import copy
+import itertools
+import json
+import math
+import threading
+import time
+import uuid
+import zlib
+from botocore.exceptions import ClientError
+
+
+class FakeSQS:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.queues = {}
+        self._lock = threading.Lock()
+
+    def add_queue(self, url, dlq_url=None, max_receive_count=3, visibility_timeout=30):
+        """Like a RedrivePolicy: after max_receive_count receives, a message moves to dlq_url."""
+        self.queues[url] = {
+            'messages': {}, # MessageId -> message
+            'receipts': {}, # ReceiptHandle -> MessageId
+            'dlq': dlq_url,
+            'max_receive': max_receive_count,
+            'visibility': visibility_timeout
+        }
+
+    def depth(self, url):
+        """(visible, in flight) message counts."""
+        now = time.monotonic()
+        with self._lock:
+            messages = self.queues[url]['messages'].values()
+            visible = sum(1 for m in messages if m['visible_at'] <= now)
+            return visible, len(messages) - visible
+
+    def _call(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _enqueue(self, url, body, attributes=None, first_receive=None):
+        message_id = str(uuid.uuid4())
+        self.queues[url]['messages'][message_id] = {
+            'MessageId': message_id,
+            'Body': body,
+            'MessageAttributes': copy.deepcopy(attributes or {}),
+            'sent': time.time(),
+            'first_receive': first_receive,
+            'receives': 0,
+            'visible_at': 0.0,
+            'receipt': None
+        }
+        return message_id
+
+    def send_message(self, QueueUrl, MessageBody, MessageAttributes=None, **kwargs):
+        self._call()
+        with self._lock:
+            return {'MessageId': self._enqueue(QueueUrl, MessageBody, MessageAttributes),
+                    'ResponseMetadata': {'RetryAttempts': 0}}
+
+    def send_message_batch(self, QueueUrl, Entries):
+        self._call()
+        with self._lock:
+            successful = [
+                {'Id': entry['Id'], 'MessageId': self._enqueue(QueueUrl, entry['MessageBody'], entry.get('MessageAttributes'))}
+                for entry in Entries
+            ]
+        return {'Successful': successful, 'Failed': [], 'ResponseMetadata': {'RetryAttempts': 0}}
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages=1, VisibilityTimeout=None, **kwargs):
+        self._call()
+        queue = self.queues[QueueUrl]
+        now = time.monotonic()
+        received = []
+        with self._lock:
+            for message_id, message in list(queue['messages'].items()):
+                if len(received) == MaxNumberOfMessages:
+                    break
+                if message['visible_at'] > now:
+                    continue
+                if queue['dlq'] and message['receives'] >= queue['max_receive']:
+                    # Dead-lettered on the receive after the last allowed one, like SQS
+                    del queue['messages'][message_id]
+                    queue['receipts'].pop(message['receipt'], None)
+                    self.queues[queue['dlq']]['messages'][message_id] = dict(message, receives=0, visible_at=0.0)
+                    continue
+                message['receives'] += 1
+                message['first_receive'] = message['first_receive'] or time.time()
+                message['visible_at'] = now + (queue['visibility'] if VisibilityTimeout is None else VisibilityTimeout)
+                queue['receipts'].pop(message['receipt'], None)
+                message['receipt'] = str(uuid.uuid4())
+                queue['receipts'][message['receipt']] = message_id
+                received.append({
+                    'MessageId': message_id,
+                    'ReceiptHandle': message['receipt'],
+                    'Body': message['Body'],
+                    'MessageAttributes': copy.deepcopy(message['MessageAttributes']),
+                    'Attributes': {
+                        'ApproximateReceiveCount': str(message['receives']),
+                        'SentTimestamp': str(int(message['sent'] * 1000)),
+                        'ApproximateFirstReceiveTimestamp': str(int(message['first_receive'] * 1000))
+                    }
+                })
+        response = {'ResponseMetadata': {'RetryAttempts': 0}}
+        if received:
+            response['Messages'] = received
+        return response
+
+    def _delete(self, url, receipt):
+        queue = self.queues[url]
+        message_id = queue['receipts'].pop(receipt, None)
+        queue['messages'].pop(message_id, None)
+
+    def delete_message(self, QueueUrl, ReceiptHandle):
+        self._call()
+        with self._lock:
+            self._delete(QueueUrl, ReceiptHandle)
+        return {'ResponseMetadata': {'RetryAttempts': 0}}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        self._call()
+        with self._lock:
+            for entry in Entries:
+                self._delete(QueueUrl, entry['ReceiptHandle'])
+        return {'Successful': [{'Id': entry['Id']} for entry in Entries], 'Failed': [],
+                'ResponseMetadata': {'RetryAttempts': 0}}
+
+    def change_message_visibility(self, QueueUrl, ReceiptHandle, VisibilityTimeout):
+        self._call()
+        with self._lock:
+            queue = self.queues[QueueUrl]
+            message = queue['messages'].get(queue['receipts'].get(ReceiptHandle))
+            if message is not None:
+                message['visible_at'] = time.monotonic() + VisibilityTimeout
+        return {'ResponseMetadata': {'RetryAttempts': 0}}
+
+    def get_queue_attributes(self, QueueUrl, AttributeNames=None):
+        visible, in_flight = self.depth(QueueUrl)
+        return {'Attributes': {
+            'ApproximateNumberOfMessages': str(visible),
+            'ApproximateNumberOfMessagesNotVisible': str(in_flight)
+        }}
+
+
+def to_sqs_event(messages, queue_arn='arn:aws:sqs:eu-west-1:000000000000:todo-queue-bench'):
+    """Turns received messages into the event Lambda passes to an SQS-triggered function."""
+    return {'Records': [{
+        'messageId': message['MessageId'],
+        'receiptHandle': message['ReceiptHandle'],
+        'body': message['Body'],
+        'attributes': message['Attributes'],
+        'messageAttributes': message['MessageAttributes'],
+        'eventSource': 'aws:sqs',
+        'eventSourceARN': queue_arn
+    } for message in messages]}
+
+
+class FakeDynamoDB:
+    """
+    Stands in for boto3.resource('dynamodb'). Tables are keyed by 'id', like the todo table.
+    write_fault(item) returning True leaves that item in UnprocessedItems (throttling / poison injection).
+    """
+    def __init__(self, latency=0.0, write_fault=None):
+        self.latency = latency
+        self.write_fault = write_fault
+        self.tables = {}
+        self.indexes = {}
+        self.client = FakeDynamoClient(self)
+        self._lock = threading.Lock()
+
+    def create_table(self, name, indexes=None):
+        """indexes: {index name: (hash attribute, range attribute)}"""
+        self.tables[name] = {}
+        self.indexes[name] = dict(indexes or {})
+
+    def Table(self, name):
+        return FakeTable(self, name)
+
+    def _call(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _scan(self, table, Limit=None, ExclusiveStartKey=None, Segment=None, TotalSegments=None,
+              ProjectionExpression=None, ExpressionAttributeNames=None, FilterExpression=None, **kwargs):
+        self._call()
+        with self._lock:
+            ids = sorted(self.tables[table])
+            if TotalSegments:
+                ids = [i for i in ids if zlib.crc32(i.encode()) % TotalSegments == Segment]
+            if ExclusiveStartKey:
+                ids = [i for i in ids if i > ExclusiveStartKey['id']]
+            items = [self.tables[table][i] for i in ids]
+        return self._page(items, Limit, ProjectionExpression, ExpressionAttributeNames, FilterExpression,
+                          lambda item: {'id': item['id']}, table, kwargs.get('ReturnConsumedCapacity'))
+
+    def _query(self, table, IndexName, KeyConditionExpression, ScanIndexForward=True, Limit=None,
+               ExclusiveStartKey=None, ProjectionExpression=None, ExpressionAttributeNames=None,
+               FilterExpression=None, **kwargs):
+        self._call()
+        hash_key, range_key = self.indexes[table][IndexName]
+        with self._lock:
+            items = [item for item in self.tables[table].values()
+                     if hash_key in item and _matches(KeyConditionExpression, item)]
+        items.sort(key=lambda item: (item.get(range_key, ''), item['id']), reverse=not ScanIndexForward)
+        if ExclusiveStartKey:
+            position = next(idx for idx, item in enumerate(items) if item['id'] == ExclusiveStartKey['id'])
+            items = items[position + 1:]
+        return self._page(items, Limit, ProjectionExpression, ExpressionAttributeNames, FilterExpression,
+                          lambda item: {'id': item['id'], hash_key: item[hash_key], range_key: item.get(range_key)},
+                          table, kwargs.get('ReturnConsumedCapacity'))
+
+    def _page(self, items, limit, projection, names, filter_expression, last_key, table, return_capacity):
+        page = items[:limit] if limit else items
+        result = [item for item in page if filter_expression is None or _matches(filter_expression, item)]
+        response = {
+            'Items': [_project(item, projection, names) for item in result],
+            'Count': len(result),
+            'ScannedCount': len(page),
+            'ResponseMetadata': {'RetryAttempts': 0}
+        }
+        if limit and len(items) > limit:
+            response['LastEvaluatedKey'] = last_key(page[-1])
+        if return_capacity:
+            # Eventually consistent reads: 0.5 units per started 4 KB read
+            size = len(json.dumps(page, default=str))
+            response['ConsumedCapacity'] = {'TableName': table, 'CapacityUnits': max(0.5, math.ceil(size / 4096) * 0.5)}
+        return response
+
+    def _write_units(self, table, item):
+        """1 unit for the table, plus 1 for every index the item appears in (items are under 1 KB)."""
+        return 1 + sum(1 for hash_key, _ in self.indexes[table].values() if hash_key in item)
+
+
+class FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.meta = type('Meta', (), {'client': db.client})()
+
+    def scan(self, **kwargs):
+        return self.db._scan(self.name, **kwargs)
+
+    def query(self, **kwargs):
+        return self.db._query(self.name, **kwargs)
+
+    def put_item(self, Item, **kwargs):
+        self.db._call()
+        with self.db._lock:
+            self.db.tables[self.name][Item['id']] = copy.deepcopy(Item)
+        return {'ResponseMetadata': {'RetryAttempts': 0}}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues, ExpressionAttributeNames=None, **kwargs):
+        """Only 'ADD <attribute> <:value>', the counter update processTodo does."""
+        self.db._call()
+        action, name, placeholder = UpdateExpression.split()
+        if action != 'ADD':
+            raise NotImplementedError(f"Unsupported update: {UpdateExpression}")
+        name = (ExpressionAttributeNames or {}).get(name, name)
+        with self.db._lock:
+            item = self.db.tables[self.name].setdefault(Key['id'], dict(Key))
+            item[name] = item.get(name, 0) + ExpressionAttributeValues[placeholder]
+        return {'ResponseMetadata': {'RetryAttempts': 0}}
+
+    def get_item(self, Key, **kwargs):
+        self.db._call()
+        with self.db._lock:
+            item = self.db.tables[self.name].get(Key['id'])
+        response = {'ResponseMetadata': {'RetryAttempts': 0}}
+        if item is not None:
+            response['Item'] = copy.deepcopy(item)
+        return response
+
+
+class FakeDynamoClient:
+    """Stands in for the resource's meta.client (plain Python types in and out)."""
+    def __init__(self, db):
+        self.db = db
+
+    def scan(self, TableName, **kwargs):
+        return self.db._scan(TableName, **kwargs)
+
+    def put_item(self, TableName, Item, ConditionExpression=None, **kwargs):
+        """Only the 'attribute_not_exists(id)' condition processTodo uses. write_fault throttles the put."""
+        self.db._call()
+        if ConditionExpression not in (None, 'attribute_not_exists(id)'):
+            raise NotImplementedError(f"Unsupported condition: {ConditionExpression}")
+        with self.db._lock:
+            if self.db.write_fault and self.db.write_fault(Item):
+                raise _client_error('ProvisionedThroughputExceededException', 'PutItem')
+            if ConditionExpression and Item['id'] in self.db.tables[TableName]:
+                raise _client_error('ConditionalCheckFailedException', 'PutItem')
+            self.db.tables[TableName][Item['id']] = copy.deepcopy(Item)
+            units = self.db._write_units(TableName, Item)
+        response = {'ResponseMetadata': {'RetryAttempts': 0}}
+        if kwargs.get('ReturnConsumedCapacity'):
+            response['ConsumedCapacity'] = {'TableName': TableName, 'CapacityUnits': units}
+        return response
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        self.db._call()
+        unprocessed = {}
+        capacity = []
+        with self.db._lock:
+            for table, requests in RequestItems.items():
+                units = 0
+                for request in requests:
+                    item = request['PutRequest']['Item']
+                    if self.db.write_fault and self.db.write_fault(item):
+                        unprocessed.setdefault(table, []).append(request)
+                    else:
+                        self.db.tables[table][item['id']] = copy.deepcopy(item)
+                        units += self.db._write_units(table, item)
+                capacity.append({'TableName': table, 'CapacityUnits': units})
+        response = {'UnprocessedItems': unprocessed, 'ResponseMetadata': {'RetryAttempts': 0}}
+        if kwargs.get('ReturnConsumedCapacity'):
+            response['ConsumedCapacity'] = capacity
+        return response
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        self.db._call()
+        responses = {}
+        with self.db._lock:
+            for table, request in RequestItems.items():
+                items = (self.db.tables[table].get(key['id']) for key in request['Keys'])
+                responses[table] = [
+                    _project(item, request.get('ProjectionExpression'), request.get('ExpressionAttributeNames'))
+                    for item in items if item is not None
+                ]
+        response = {'Responses': responses, 'UnprocessedKeys': {}, 'ResponseMetadata': {'RetryAttempts': 0}}
+        if kwargs.get('ReturnConsumedCapacity'):
+            response['ConsumedCapacity'] = [
+                {'TableName': table, 'CapacityUnits': 0.5 * len(request['Keys'])} for table, request in RequestItems.items()
+            ]
+        return response
+
+
+def _client_error(code, operation):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, operation)
+
+
+def _project(item, projection, names):
+    if not projection:
+        return copy.deepcopy(item)
+    names = names or {}
+    fields = [names.get(part.strip(), part.strip()) for part in projection.split(',')]
+    return {field: copy.deepcopy(item[field]) for field in fields if field in item}
+
+
+def _matches(condition, item):
+    """Evaluates the boto3 Key()/Attr() conditions the handlers build: equality, joined with AND."""
+    expression = condition.get_expression()
+    if expression['operator'] == 'AND':
+        return all(_matches(part, item) for part in expression['values'])
+    if expression['operator'] == '=':
+        attribute, value = expression['values']
+        return item.get(attribute.name) == value
+    raise NotImplementedError(f"Unsupported condition: {expression['operator']}")
+
+
+def seed_todos(db, table, count, owners=('alice', 'bob', None)):
+    """Writes `count` todos shaped like the ones processTodo writes."""
+    created = time.time()
+    for idx, owner in zip(range(count), itertools.cycle(owners)):
+        item = {
+            'id': str(uuid.uuid4()),
+            'idempotency_key': str(uuid.uuid4()),
+            'task': f"Seeded todo {idx}",
+            'completed': idx % 3 == 0,
+            'status': 'completed' if idx % 3 == 0 else 'open',
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(created - idx)) + '+00:00'
+        }
+        if owner:
+            item['owner'] = owner
+        db.tables[table][item['id']] = item
+
+
+# Names the benchmarks run under; the handlers read them from the environment at import time
+TABLE_NAME = 'todo-table-bench'
+META_TABLE_NAME = 'todo-meta-bench'
+QUEUE_URL = 'https://sqs.eu-west-1.amazonaws.com/000000000000/todo-queue-bench'
+DLQ_URL = 'https://sqs.eu-west-1.amazonaws.com/000000000000/todo-dlq-bench'
+ENV = {
+    'TABLE_NAME': TABLE_NAME,
+    'META_TABLE_NAME': META_TABLE_NAME,
+    'QUEUE_URL': QUEUE_URL,
+    'DLQ_URL': DLQ_URL,
+    'OWNER_INDEX_ENABLED': 'true',
+    'AWS_DEFAULT_REGION': 'eu-west-1'
+}
+INDEXES = {
+    'status-created_at-index': ('status', 'created_at'),
+    'owner-created_at-index': ('owner', 'created_at')
+}
+
+
+def install(latency=0.0, max_receive_count=3, visibility_timeout=30, write_fault=None):
+    """Creates the fake queues and table like serverless.yml does and registers them with src.runtime."""
+    from src import runtime
+
+    sqs = FakeSQS(latency)
+    sqs.add_queue(DLQ_URL)
+    sqs.add_queue(QUEUE_URL, dlq_url=DLQ_URL, max_receive_count=max_receive_count,
+                  visibility_timeout=visibility_timeout)
+    db = FakeDynamoDB(latency, write_fault)
+    db.create_table(TABLE_NAME, INDEXES)
+    db.create_table(META_TABLE_NAME)
+
+    runtime.register('client', 'sqs', sqs)
+    runtime.register('resource', 'dynamodb', db)
+    runtime.register('table', TABLE_NAME, db.Table(TABLE_NAME))
+    runtime.register('table', META_TABLE_NAME, db.Table(META_TABLE_NAME))
+    return sqs, db
@@ -0,0 +1,297 @@
+"""
+Load test of the whole pipeline, in one process, against the in-memory fakes:
+
+    addTodo/addTodos -> SQS -> processTodo -> DynamoDB -> getTodos
+
+    python bench/loadtest.py --rate 200 --duration 5 --consumers 4 --sqs-batch-size 10
+    python bench/loadtest.py --ingest-batch 50 --poison-rate 0.01 --throttle-rate 0.2
+
+Requests are sent open-loop at --rate per second. --consumers threads act like the SQS event
+source mapping: they collect up to --sqs-batch-size messages within --batch-window, invoke
+processTodo, delete what succeeded and make the reported failures visible again after
+--retry-delay. After --max-receive receives a message spills to the DLQ.
+--poison-rate todos can never be written; --throttle-rate of the writes come back unprocessed.
+Prints per-stage throughput and latency percentiles, queue depth and DLQ spill as JSON, plus
+a summary of the CloudWatch EMF metrics the handlers printed (see src/metrics.py).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from bench import fakes
+from bench.stats import summarize
+
+# The handlers read their configuration at import time
+os.environ.update(fakes.ENV)
+from src import createTodo, getTodo, metrics, processTodo
+
+POISON = "[poison]"
+
+class EMFCapture(io.TextIOBase):
+    """
+    Replaces stdout during the run and keeps only the EMF records. print() hands each record
+    to write() in one piece, so records from different threads never interleave.
+    """
+    def __init__(self):
+        self.records = []
+
+    def write(self, text):
+        if text.startswith('{"_aws"'):
+            self.records.append(text)
+        return len(text)
+
+class Recorder:
+    """Thread-safe lists of durations (ms) and counters, by name."""
+    def __init__(self):
+        self.durations = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def time(self, name, ms):
+        with self.lock:
+            self.durations.setdefault(name, []).append(ms)
+
+    def add(self, name, count=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + count
+
+    def get(self, name):
+        return self.counters.get(name, 0)
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.sqs, self.db = fakes.install(
+            latency=args.latency,
+            max_receive_count=args.max_receive,
+            write_fault=self.write_fault
+        )
+        self.recorder = Recorder()
+        self.ingest_done = threading.Event()
+        self.stop = threading.Event()
+        self.depths = []
+        self.ingest_seconds = 0.0
+        self.process_window = [None, None]
+
+    def write_fault(self, item):
+        if item['task'].startswith(POISON):
+            return True
+        return self.random.random() < self.args.throttle_rate
+
+    def todo(self, idx):
+        poison = self.random.random() < self.args.poison_rate
+        return {'task': f"{POISON if poison else ''}Load test todo {idx}"}
+
+    ### Stage 1: clients calling POST /todo or POST /todos/batch
+    def send_request(self, idx):
+        if self.args.ingest_batch == 1:
+            event = {'body': json.dumps(self.todo(idx)), 'headers': {}}
+            handler = createTodo.createTodo
+        else:
+            todos = [self.todo(f"{idx}-{n}") for n in range(self.args.ingest_batch)]
+            event = {'body': json.dumps(todos), 'headers': {}}
+            handler = createTodo.createTodos
+        start = time.perf_counter()
+        response = handler(event, None)
+        self.recorder.time('ingest', (time.perf_counter() - start) * 1000)
+        self.recorder.add('ingest_requests')
+        # 207: addTodos enqueued part of the batch
+        if response['statusCode'] in (202, 207):
+            accepted = json.loads(response['body']).get('accepted', 1)
+            self.recorder.add('todos_accepted', accepted)
+        if response['statusCode'] != 202:
+            self.recorder.add('ingest_errors')
+
+    def ingest(self):
+        total = int(self.args.rate * self.args.duration)
+        interval = 1.0 / self.args.rate
+        with ThreadPoolExecutor(max_workers=self.args.clients) as pool:
+            start = time.perf_counter()
+            futures = []
+            for idx in range(total):
+                delay = start + idx * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(self.send_request, idx))
+            for future in futures:
+                future.result()
+        self.ingest_seconds = time.perf_counter() - start
+        self.ingest_done.set()
+
+    ### Stage 2: the SQS event source mapping invoking processTodo
+    def collect_batch(self):
+        batch = []
+        deadline = time.perf_counter() + self.args.batch_window
+        while len(batch) < self.args.sqs_batch_size and time.perf_counter() < deadline:
+            messages = self.sqs.receive_message(
+                QueueUrl=fakes.QUEUE_URL,
+                MaxNumberOfMessages=min(10, self.args.sqs_batch_size - len(batch))
+            ).get('Messages', [])
+            if not messages:
+                time.sleep(0.002)
+            batch.extend(messages)
+        return batch
+
+    def consume(self):
+        while not self.stop.is_set():
+            batch = self.collect_batch()
+            if not batch:
+                if self.ingest_done.is_set() and self.sqs.depth(fakes.QUEUE_URL) == (0, 0):
+                    return
+                continue
+
+            now = time.perf_counter()
+            if self.process_window[0] is None:
+                self.process_window[0] = now
+            start = time.perf_counter()
+            response = processTodo.handler(fakes.to_sqs_event(batch), None)
+            self.recorder.time('process_invocation', (time.perf_counter() - start) * 1000)
+            self.recorder.time('batch_size', len(batch))
+            self.process_window[1] = time.perf_counter()
+
+            failed = {failure['itemIdentifier'] for failure in response['batchItemFailures']}
+            finished = time.time()
+            done = [message for message in batch if message['MessageId'] not in failed]
+            for message in done:
+                sent = int(message['Attributes']['SentTimestamp']) / 1000
+                self.recorder.time('end_to_end', (finished - sent) * 1000)
+            for start_idx in range(0, len(done), 10):
+                self.sqs.delete_message_batch(QueueUrl=fakes.QUEUE_URL, Entries=[
+                    {'Id': str(n), 'ReceiptHandle': message['ReceiptHandle']}
+                    for n, message in enumerate(done[start_idx:start_idx + 10])
+                ])
+            for message in batch:
+                if message['MessageId'] in failed:
+                    # Stands in for the visibility timeout running out
+                    self.sqs.change_message_visibility(QueueUrl=fakes.QUEUE_URL, ReceiptHandle=message['ReceiptHandle'],
+                                                       VisibilityTimeout=self.args.retry_delay)
+            self.recorder.add('invocations')
+            self.recorder.add('messages_processed', len(done))
+            self.recorder.add('messages_failed', len(failed))
+
+    ### Stage 3: dashboards polling GET /todos
+    def read(self):
+        interval = 1.0 / self.args.read_rate
+        queries = [{'limit': '50'}, {'limit': '50', 'completed': 'false'}]
+        idx = 0
+        while not self.ingest_done.is_set():
+            start = time.perf_counter()
+            getTodo.getTodos({'queryStringParameters': queries[idx % len(queries)]}, None)
+            elapsed = time.perf_counter() - start
+            self.recorder.time('read', elapsed * 1000)
+            idx += 1
+            time.sleep(max(0.0, interval - elapsed))
+
+    def sample_depth(self):
+        while not self.stop.is_set():
+            visible, in_flight = self.sqs.depth(fakes.QUEUE_URL)
+            dlq, _ = self.sqs.depth(fakes.DLQ_URL)
+            self.depths.append((visible, in_flight, dlq))
+            time.sleep(0.05)
+
+    def run(self):
+        threads = [threading.Thread(target=self.consume) for _ in range(self.args.consumers)]
+        threads.append(threading.Thread(target=self.read))
+        sampler = threading.Thread(target=self.sample_depth, daemon=True)
+        sampler.start()
+        for thread in threads:
+            thread.start()
+        self.ingest()
+        deadline = time.perf_counter() + self.args.drain_timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.perf_counter()))
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return self.report()
+
+    def report(self):
+        durations = self.recorder.durations
+        ingest_seconds = self.ingest_seconds
+        process_seconds = (self.process_window[1] - self.process_window[0]) if self.process_window[0] else 0
+        processed = self.recorder.get('messages_processed')
+        batch_sizes = durations.get('batch_size', [])
+        visible, in_flight = self.sqs.depth(fakes.QUEUE_URL)
+        return {
+            'config': vars(self.args),
+            'ingest': {
+                'requests': self.recorder.get('ingest_requests'),
+                'errors': self.recorder.get('ingest_errors'),
+                'todos_accepted': self.recorder.get('todos_accepted'),
+                'seconds': round(ingest_seconds, 3),
+                'requests_per_second': round(self.recorder.get('ingest_requests') / ingest_seconds, 1),
+                'latency_ms': summarize(durations.get('ingest', []))
+            },
+            'process': {
+                'invocations': self.recorder.get('invocations'),
+                'messages_processed': processed,
+                'messages_failed': self.recorder.get('messages_failed'),
+                'seconds': round(process_seconds, 3),
+                'messages_per_second': round(processed / process_seconds, 1) if process_seconds else 0,
+                'mean_batch_size': round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else 0,
+                'invocation_ms': summarize(durations.get('process_invocation', [])),
+                'end_to_end_ms': summarize(durations.get('end_to_end', []))
+            },
+            'read': {
+                'requests': len(durations.get('read', [])),
+                'latency_ms': summarize(durations.get('read', []))
+            },
+            'queue': {
+                'max_visible': max((depth[0] for depth in self.depths), default=0),
+                'max_in_flight': max((depth[1] for depth in self.depths), default=0),
+                'final_visible': visible,
+                'final_in_flight': in_flight,
+                'dlq_messages': self.sqs.depth(fakes.DLQ_URL)[0]
+            },
+            'table_items': len(self.db.tables[fakes.TABLE_NAME])
+        }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="In-process load test of the todo pipeline")
+    parser.add_argument('--rate', type=float, default=200, help="ingest requests per second")
+    parser.add_argument('--duration', type=float, default=5, help="seconds of ingest traffic")
+    parser.add_argument('--ingest-batch', type=int, default=1, help="todos per request; >1 uses POST /todos/batch")
+    parser.add_argument('--clients', type=int, default=8, help="concurrent ingest requests")
+    parser.add_argument('--consumers', type=int, default=4, help="concurrent processTodo invocations")
+    parser.add_argument('--sqs-batch-size', type=int, default=10, help="batchSize of the SQS trigger")
+    parser.add_argument('--batch-window', type=float, default=0.05, help="seconds to fill a batch")
+    parser.add_argument('--read-rate', type=float, default=20, help="GET /todos requests per second")
+    parser.add_argument('--latency', type=float, default=0.002, help="seconds added to every fake AWS call")
+    parser.add_argument('--poison-rate', type=float, default=0.0, help="fraction of todos that always fail")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="fraction of item writes left unprocessed")
+    parser.add_argument('--max-receive', type=int, default=3, help="receives before a message goes to the DLQ")
+    parser.add_argument('--retry-delay', type=float, default=0.1, help="seconds before a failed message is visible again")
+    parser.add_argument('--drain-timeout', type=float, default=30, help="max seconds to wait for the queue to empty")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    capture = EMFCapture()
+    # The handlers log every invocation; keep stdout for the report
+    with contextlib.redirect_stdout(capture):
+        report = LoadTest(args).run()
+    report['metrics'] = {
+        name: dict(summarize(values), sum=round(sum(values), 3))
+        for name, values in sorted(metrics.parse(capture.records).items())
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+
+if __name__ == '__main__':
+    main()
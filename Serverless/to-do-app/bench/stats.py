@@ -0,0 +1,21 @@
+import math
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(values_ms):
+    """count, mean and p50/p95/p99/max of durations in milliseconds."""
+    if not values_ms:
+        return {'count': 0}
+    return {
+        'count': len(values_ms),
+        'mean': round(sum(values_ms) / len(values_ms), 3),
+        'p50': round(percentile(values_ms, 50), 3),
+        'p95': round(percentile(values_ms, 95), 3),
+        'p99': round(percentile(values_ms, 99), 3),
+        'max': round(max(values_ms), 3)
+    }
@@ -1,31 +1,149 @@
 import json
 import os
-import boto3
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from src import metrics, runtime
 
-sqs = boto3.client('sqs')
 QUEUE_URL = os.environ.get('QUEUE_URL')
 
+SQS_BATCH_SIZE = 10 # SQS limit for send_message_batch
+MAX_BATCH_TODOS = 1000
+SEND_WORKERS = 8
+MAX_IDEMPOTENCY_KEY_LENGTH = 128
+
+@runtime.handler
 def createTodo(event, context):
     try:
         body = json.loads(event.get('body', '{}'))
-        task = body.get('task')
-
-        if not task:
-            return {"statusCode": 400, "body": json.dumps({"error": "Task is required"})}
+        # A client retrying the same request sends the same Idempotency-Key header
+        headers = event.get('headers') or {}
+        if isinstance(body, dict) and headers.get('idempotency-key') and 'idempotency_key' not in body:
+            body['idempotency_key'] = headers['idempotency-key']
+        message, error = build_message(body)
 
-        message = {
-            'task': task
-        }
+        if error:
+            return {"statusCode": 400, "body": json.dumps({"error": error})}
 
-        sqs.send_message(
+        metrics.call(
+            'SendMessage',
+            runtime.client('sqs').send_message,
             QueueUrl=QUEUE_URL,
             MessageBody=json.dumps(message)
         )
 
         return {
             "statusCode": 202,
-            "body": json.dumps({"message": "Todo item accepted for processing."})
+            "body": json.dumps({
+                "message": "Todo item accepted for processing.",
+                "idempotency_key": message['idempotency_key']
+            })
         }
     except Exception as e:
         print(f"Error: {e}")
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+
+@runtime.handler
+def createTodos(event, context):
+    """
+    POST /todos/batch with a JSON array of todos, e.g. [{"task": "a"}, {"task": "b", "owner": "alice"}].
+    Each todo may carry its own "idempotency_key".
+    Valid todos are enqueued with send_message_batch, 10 per call, the calls running concurrently.
+    Returns the status of every todo, by its index in the array: accepted, rejected (invalid)
+    or failed (SQS didn't take it, worth retrying). The response is 202 when nothing failed
+    and something was accepted, 400 when every todo was invalid, 503 when every todo failed
+    to enqueue and 207 for any other mix with failures.
+    """
+    try:
+        try:
+            todos = json.loads(event.get('body') or '[]')
+        except ValueError:
+            return {"statusCode": 400, "body": json.dumps({"error": "Body must be a JSON array of todos"})}
+        if not isinstance(todos, list) or not todos:
+            return {"statusCode": 400, "body": json.dumps({"error": "Body must be a non-empty JSON array of todos"})}
+        if len(todos) > MAX_BATCH_TODOS:
+            return {"statusCode": 400, "body": json.dumps({"error": f"At most {MAX_BATCH_TODOS} todos per request"})}
+
+        results = [None] * len(todos)
+        keys = {}
+        entries = []
+        for idx, todo in enumerate(todos):
+            message, error = build_message(todo)
+            if error:
+                results[idx] = {"index": idx, "status": "rejected", "error": error}
+            else:
+                entries.append({'Id': str(idx), 'MessageBody': json.dumps(message)})
+                keys[idx] = message['idempotency_key']
+
+        chunks = [entries[start:start + SQS_BATCH_SIZE] for start in range(0, len(entries), SQS_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=SEND_WORKERS) as pool:
+            for chunk_results in pool.map(metrics.propagate(send_chunk), chunks):
+                for idx, result in chunk_results:
+                    if result["status"] == "accepted":
+                        result["idempotency_key"] = keys[idx]
+                    results[idx] = result
+
+        counts = {status: sum(1 for result in results if result["status"] == status)
+                  for status in ("accepted", "rejected", "failed")}
+        metrics.put('BatchSize', len(todos))
+        metrics.put('TodosRejected', counts["rejected"])
+        metrics.put('TodosFailed', counts["failed"])
+        return {
+            "statusCode": batch_status(**counts),
+            "body": json.dumps({**counts, "results": results})
+        }
+    except Exception as e:
+        print(f"Error: {e}")
+        return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+
+def batch_status(accepted, rejected, failed):
+    """Only invalid todos are the client's fault; todos SQS didn't take are ours."""
+    if not failed:
+        return 202 if accepted else 400
+    if not accepted and not rejected:
+        return 503
+    return 207
+
+def build_message(body):
+    """
+    Validates one todo. Returns (message, None) or (None, error).
+    Without an idempotency_key a new one is generated, which still makes SQS
+    redeliveries and DLQ re-drives of this message safe.
+    """
+    if not isinstance(body, dict):
+        return None, "Todo must be a JSON object"
+    task = body.get('task')
+    owner = body.get('owner')
+    idempotency_key = body.get('idempotency_key', str(uuid.uuid4()))
+
+    if not task:
+        return None, "Task is required"
+    if owner is not None and (not isinstance(owner, str) or not owner):
+        return None, "Owner must be a non-empty string"
+    if not isinstance(idempotency_key, str) or not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        return None, f"Idempotency key must be a string of 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+
+    message = {
+        'task': task,
+        'idempotency_key': idempotency_key
+    }
+    if owner:
+        message['owner'] = owner
+    return message, None
+
+def send_chunk(entries):
+    """Sends up to 10 entries. Returns (index, result) pairs; a failed call rejects the whole chunk."""
+    try:
+        response = metrics.call('SendMessageBatch', runtime.client('sqs').send_message_batch,
+                                QueueUrl=QUEUE_URL, Entries=entries)
+    except Exception as e:
+        print(f"Error sending batch of {len(entries)} todos: {e}")
+        return [(int(entry['Id']), {"index": int(entry['Id']), "status": "failed", "error": "Could not enqueue todo"})
+                for entry in entries]
+
+    results = [(int(entry['Id']), {"index": int(entry['Id']), "status": "accepted"})
+               for entry in response.get('Successful', [])]
+    for failure in response.get('Failed', []):
+        print(f"Todo {failure['Id']} was not enqueued: {failure.get('Code')} {failure.get('Message')}")
+        results.append((int(failure['Id']), {"index": int(failure['Id']), "status": "failed",
+                                              "error": failure.get('Message') or failure.get('Code')}))
+    return results
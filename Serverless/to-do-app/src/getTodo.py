@@ -1,20 +1,290 @@
+import base64
+import binascii
+import hashlib
+import itertools
 import json
 import os
-import boto3
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from boto3.dynamodb.conditions import Attr, Key
+from src import metrics, runtime
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ.get('TABLE_NAME'))
+TABLE_NAME = os.environ.get('TABLE_NAME')
+META_TABLE_NAME = os.environ.get('META_TABLE_NAME')
 
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+EXPORT_SEGMENTS = int(os.environ.get('EXPORT_SEGMENTS', '4'))
+# Body size of one export page; Lambda fails responses over 6 MB with a 502
+EXPORT_MAX_BYTES = int(os.environ.get('EXPORT_MAX_BYTES', str(5 * 1024 * 1024)))
+KEY_ATTRIBUTE = 'id'
+FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+STATUS_INDEX = 'status-created_at-index'
+OWNER_INDEX = 'owner-created_at-index'
+# Set once the owner index is deployed (it is created by a later stack update than the status index)
+OWNER_INDEX_ENABLED = os.environ.get('OWNER_INDEX_ENABLED', 'false') == 'true'
+STATUSES = {'false': 'open', 'true': 'completed'}
+
+# Warm-container cache of response bodies, by query string. An entry is served as is for
+# CACHE_TTL_SECONDS; after that it's reused only while the version marker processTodo bumps
+# on every write is unchanged, which costs a GetItem instead of a Scan/Query.
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '5'))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '128'))
+VERSION_KEY = {'id': 'todos'}
+_cache = OrderedDict() # cache key -> {'version', 'expires', 'body', 'etag'}
+
+class BadRequest(Exception):
+    pass
+
+@runtime.handler
 def getTodos(event, context):
+    """
+    GET /todos?limit=&cursor=&fields=id,task[&completed=true|false][&owner=]
+               [&segment=&segments=][&export=true]
+    Returns one page of todos plus an opaque cursor for the next page.
+    Filtering by completed/owner queries a GSI, newest todos first.
+    Pages are cached in the container (X-Cache: HIT/REVALIDATED/MISS/BYPASS) and carry an ETag;
+    a matching If-None-Match gets a 304 without a body.
+    export=true returns NDJSON pages of at most EXPORT_MAX_BYTES instead (see export_todos).
+    """
     try:
-        # Scan returns all items in the table
-        response = table.scan()
-        items = response.get('Items', [])
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps(items)
-        }
+        params = event.get('queryStringParameters') or {}
+        read_kwargs = projection_kwargs(params.get('fields'))
+        query_kwargs = index_query_kwargs(params)
+
+        if params.get('export') == 'true':
+            if query_kwargs:
+                raise BadRequest("export can't be combined with completed or owner")
+            return export_todos(read_kwargs, params.get('cursor'))
+
+        read_kwargs['Limit'] = parse_int(params, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        if params.get('cursor'):
+            read_kwargs['ExclusiveStartKey'] = decode_cursor(params['cursor'])
+
+        # Lets clients page through segments of a parallel scan concurrently
+        if 'segments' in params and not query_kwargs:
+            read_kwargs['TotalSegments'] = parse_int(params, 'segments', 1, 1, 1000000)
+            read_kwargs['Segment'] = parse_int(params, 'segment', 0, 0, read_kwargs['TotalSegments'] - 1)
+
+        body, etag, cache_status = cached_page(
+            json.dumps(params, sort_keys=True),
+            lambda: read_page(read_kwargs, query_kwargs)
+        )
+        # The average of CacheHit is the hit rate
+        metrics.put('CacheHit', 1 if cache_status in ('HIT', 'REVALIDATED') else 0)
+
+        headers = {"ETag": etag, "X-Cache": cache_status, "Cache-Control": "no-cache"}
+        if_none_match = (event.get('headers') or {}).get('if-none-match', '')
+        if if_none_match == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return {"statusCode": 304, "headers": headers}
+        return {"statusCode": 200, "headers": headers, "body": body}
+    except BadRequest as e:
+        return {"statusCode": 400, "body": json.dumps({"error": str(e)})}
     except Exception as e:
         print(f"Error fetching todos: {str(e)}")
-        return {"statusCode": 500, "body": json.dumps({"error": "Internal Server Error"})}
\ No newline at end of file
+        return {"statusCode": 500, "body": json.dumps({"error": "Internal Server Error"})}
+
+def read_page(read_kwargs, query_kwargs):
+    read_kwargs = dict(read_kwargs, ReturnConsumedCapacity='TOTAL')
+    if query_kwargs:
+        response = metrics.call('Query', runtime.table(TABLE_NAME).query, **read_kwargs, **query_kwargs)
+    else:
+        response = metrics.call('Scan', runtime.table(TABLE_NAME).scan, **read_kwargs)
+    metrics.put('ItemsReturned', len(response.get('Items', [])))
+    return json.dumps({
+        "items": response.get('Items', []),
+        "next_cursor": encode_cursor(response.get('LastEvaluatedKey'))
+    }, default=json_default)
+
+def cached_page(key, load):
+    """
+    Returns (body, etag, cache status), calling load() only when the cached body is stale.
+    If the version marker can't be read, the body is loaded and returned without caching (BYPASS).
+    """
+    now = time.monotonic()
+    entry = _cache.get(key)
+    if entry and now < entry['expires']:
+        _cache.move_to_end(key)
+        return entry['body'], entry['etag'], 'HIT'
+
+    # Read before the table, so a write racing with load() leaves the entry with an older version
+    try:
+        version = current_version()
+    except Exception as e:
+        # The cache is never less available than the table behind it: serve uncached
+        print(f"[DynamoDB ERROR] version marker unavailable, cache bypassed: {e}")
+        body = load()
+        return body, etag_of(body), 'BYPASS'
+    if entry and version is not None and entry['version'] == version:
+        entry['expires'] = now + CACHE_TTL_SECONDS
+        _cache.move_to_end(key)
+        return entry['body'], entry['etag'], 'REVALIDATED'
+
+    body = load()
+    etag = etag_of(body)
+    _cache[key] = {'version': version, 'expires': now + CACHE_TTL_SECONDS, 'body': body, 'etag': etag}
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+    return body, etag, 'MISS'
+
+def etag_of(body):
+    return '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+
+def current_version():
+    """The todos version marker, or None when there's no meta table (entries then only live for the TTL)."""
+    if not META_TABLE_NAME:
+        return None
+    response = metrics.call('GetItem', runtime.table(META_TABLE_NAME).get_item,
+                            Key=VERSION_KEY, ProjectionExpression='#version',
+                            ExpressionAttributeNames={'#version': 'version'})
+    return int(response.get('Item', {}).get('version', 0))
+
+def export_todos(scan_kwargs, cursor=None):
+    """
+    One page of the full export: each segment of a parallel scan is read by its own thread
+    until it has its share of EXPORT_MAX_BYTES. Returns NDJSON, plus an X-Next-Cursor header
+    while some segment has more to read (pass it back as ?cursor= with export=true).
+    """
+    total, positions = decode_export_cursor(cursor) if cursor else (EXPORT_SEGMENTS, dict.fromkeys(range(EXPORT_SEGMENTS)))
+    # Segments that finished on earlier pages leave their share to the others
+    share = EXPORT_MAX_BYTES // len(positions)
+    scan_kwargs, strip_key = with_key_attribute(scan_kwargs)
+    # The resource's client is thread-safe and still (de)serializes plain Python types
+    client = runtime.table(TABLE_NAME).meta.client
+
+    def read_segment(segment):
+        """Returns (NDJSON lines, key to continue after or None once the segment is done)."""
+        lines, size, last_key = [], 0, None
+        kwargs = dict(scan_kwargs, TableName=TABLE_NAME, Segment=segment, TotalSegments=total,
+                      ReturnConsumedCapacity='TOTAL')
+        if positions[segment]:
+            kwargs['ExclusiveStartKey'] = positions[segment]
+        while True:
+            response = metrics.call('Scan', client.scan, **kwargs)
+            for item in response.get('Items', []):
+                key = {KEY_ATTRIBUTE: item[KEY_ATTRIBUTE]}
+                if strip_key:
+                    del item[KEY_ATTRIBUTE]
+                line = json.dumps(item, default=json_default)
+                # At least one item per page, so an export always makes progress
+                if lines and size + len(line) + 1 > share:
+                    return lines, last_key
+                lines.append(line)
+                size += len(line) + 1 # ASCII-only (json.dumps escapes the rest), plus the newline
+                last_key = key
+            if 'LastEvaluatedKey' not in response:
+                return lines, None
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    segments = sorted(positions)
+    with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+        pages = list(pool.map(metrics.propagate(read_segment), segments))
+
+    headers = {"Content-Type": "application/x-ndjson"}
+    remaining = {str(segment): key for segment, (_, key) in zip(segments, pages) if key}
+    if remaining:
+        headers["X-Next-Cursor"] = encode_cursor({'segments': total, 'next': remaining})
+    return {
+        "statusCode": 200,
+        "headers": headers,
+        "body": "\n".join(itertools.chain.from_iterable(lines for lines, _ in pages))
+    }
+
+def decode_export_cursor(cursor):
+    """Returns (total segments, {segment: key to continue after}) from an X-Next-Cursor value."""
+    state = decode_cursor(cursor)
+    total, remaining = state.get('segments'), state.get('next')
+    if not isinstance(total, int) or total < 1 or not isinstance(remaining, dict) or not remaining:
+        raise BadRequest("Invalid cursor")
+    try:
+        positions = {int(segment): key for segment, key in remaining.items()}
+    except ValueError:
+        raise BadRequest("Invalid cursor")
+    if not all(0 <= segment < total and isinstance(key, dict) for segment, key in positions.items()):
+        raise BadRequest("Invalid cursor")
+    return total, positions
+
+def with_key_attribute(scan_kwargs):
+    """
+    Adds the table key to a fields= projection, since export cursors are built from it.
+    Returns (scan kwargs, whether the key must be left out of the output).
+    """
+    names = scan_kwargs.get('ExpressionAttributeNames', {})
+    if 'ProjectionExpression' not in scan_kwargs or KEY_ATTRIBUTE in names.values():
+        return scan_kwargs, False
+    return dict(
+        scan_kwargs,
+        ProjectionExpression=scan_kwargs['ProjectionExpression'] + ', #key',
+        ExpressionAttributeNames=dict(names, **{'#key': KEY_ATTRIBUTE})
+    ), True
+
+def index_query_kwargs(params):
+    """Picks the GSI for the completed/owner filters. Returns {} when a scan is needed."""
+    completed = params.get('completed')
+    owner = params.get('owner')
+    if completed is not None and completed not in STATUSES:
+        raise BadRequest("completed must be true or false")
+
+    if owner and not OWNER_INDEX_ENABLED:
+        raise BadRequest("filtering by owner isn't available yet")
+    if owner:
+        kwargs = {'IndexName': OWNER_INDEX, 'KeyConditionExpression': Key('owner').eq(owner)}
+        if completed is not None:
+            # Only the owner's todos are read, so filtering them stays cheap
+            kwargs['FilterExpression'] = Attr('status').eq(STATUSES[completed])
+    elif completed is not None:
+        kwargs = {'IndexName': STATUS_INDEX, 'KeyConditionExpression': Key('status').eq(STATUSES[completed])}
+    else:
+        return {}
+    kwargs['ScanIndexForward'] = False
+    return kwargs
+
+def projection_kwargs(fields):
+    """Turns fields=a,b into a ProjectionExpression, with placeholders so reserved words are safe."""
+    if not fields:
+        return {}
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    if not names or not all(FIELD_NAME.match(name) for name in names):
+        raise BadRequest("fields must be a comma separated list of attribute names")
+    return {
+        'ProjectionExpression': ', '.join(f"#f{idx}" for idx in range(len(names))),
+        'ExpressionAttributeNames': {f"#f{idx}": name for idx, name in enumerate(names)}
+    }
+
+def parse_int(params, name, default, minimum, maximum):
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if not minimum <= value <= maximum:
+        raise BadRequest(f"{name} must be between {minimum} and {maximum}")
+    return value
+
+def encode_cursor(last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, default=json_default).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise BadRequest("Invalid cursor")
+    if not isinstance(key, dict):
+        raise BadRequest("Invalid cursor")
+    return key
+
+def json_default(value):
+    # DynamoDB returns every number as Decimal
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,145 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+### CloudWatch Embedded Metric Format (EMF): metrics are printed as JSON log lines and CloudWatch
+### extracts them from the function's log group, so no API call (or latency) is added.
+### Values are collected in memory during an invocation and printed once at its end by
+### runtime.handler, so the hot path only appends to a list.
+### Each invocation has its own buffer, bound to the thread running it: invocations running
+### side by side in one process (the local benchmarks) never flush each other's values.
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'TodoApp')
+MAX_VALUES = 100 # EMF limit of values per metric in one record
+
+class Buffer:
+    """The values of one invocation: name -> (unit, [values]). Shared with its worker threads."""
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def put(self, name, value, unit):
+        with self.lock:
+            self.values.setdefault(name, (unit, []))[1].append(value)
+
+    def drain(self):
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+
+_local = threading.local()
+_unbound = Buffer() # values put outside an invocation, printed by the next flush() on any thread
+
+def _buffer():
+    return getattr(_local, 'buffer', None) or _unbound
+
+@contextmanager
+def invocation():
+    """Binds a fresh buffer to the current thread for the duration of one invocation."""
+    previous = getattr(_local, 'buffer', None)
+    _local.buffer = Buffer()
+    try:
+        yield _local.buffer
+    finally:
+        _local.buffer = previous
+
+def propagate(func):
+    """
+    Wraps func so it records into the calling invocation's buffer when run on another thread,
+    e.g. pool.map(metrics.propagate(send_chunk), chunks).
+    """
+    buffer = _buffer()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, 'buffer', None)
+        _local.buffer = buffer
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.buffer = previous
+    return wrapper
+
+def put(name, value, unit='Count'):
+    _buffer().put(name, value, unit)
+
+@contextmanager
+def timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        put(name, (time.perf_counter() - start) * 1000, 'Milliseconds')
+
+def call(operation, method, **kwargs):
+    """
+    Calls an AWS API method and records <operation>Latency, <operation>Retries (retries done by
+    botocore) and, when DynamoDB returns it, <operation>ConsumedCapacity. Failures add <operation>Errors.
+    """
+    start = time.perf_counter()
+    try:
+        response = method(**kwargs)
+    except Exception:
+        put(f'{operation}Errors', 1)
+        raise
+    finally:
+        put(f'{operation}Latency', (time.perf_counter() - start) * 1000, 'Milliseconds')
+
+    put(f'{operation}Retries', response.get('ResponseMetadata', {}).get('RetryAttempts', 0))
+    capacity = response.get('ConsumedCapacity')
+    if capacity:
+        # A dict for Scan/Query, one entry per table for the batch operations
+        entries = capacity if isinstance(capacity, list) else [capacity]
+        put(f'{operation}ConsumedCapacity', sum(entry.get('CapacityUnits', 0) for entry in entries))
+    return response
+
+def flush(dimensions):
+    """
+    Prints the current invocation's values as EMF records (more than one if a metric has over
+    100 values), plus anything put outside an invocation.
+    """
+    values = _unbound.drain()
+    if _buffer() is not _unbound:
+        for name, (unit, metric_values) in _buffer().drain().items():
+            values.setdefault(name, (unit, []))[1].extend(metric_values)
+    if not values:
+        return
+
+    longest = max(len(metric_values) for _, metric_values in values.values())
+    for offset in range(0, longest, MAX_VALUES):
+        chunk = {
+            name: (unit, metric_values[offset:offset + MAX_VALUES])
+            for name, (unit, metric_values) in values.items() if len(metric_values) > offset
+        }
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": NAMESPACE,
+                    "Dimensions": [list(dimensions)],
+                    "Metrics": [{"Name": name, "Unit": unit} for name, (unit, _) in chunk.items()]
+                }]
+            },
+            **dimensions
+        }
+        for name, (_, metric_values) in chunk.items():
+            record[name] = metric_values if len(metric_values) > 1 else metric_values[0]
+        print(json.dumps(record))
+
+def parse(lines):
+    """
+    Reads EMF records back from log output, e.g. captured stdout of a local run.
+    Returns {metric name: [values]}; other lines are ignored.
+    """
+    collected = {}
+    for line in lines:
+        if not line.startswith('{"_aws"'):
+            continue
+        record = json.loads(line)
+        for definition in record['_aws']['CloudWatchMetrics']:
+            for metric in definition['Metrics']:
+                value = record[metric['Name']]
+                collected.setdefault(metric['Name'], []).extend(value if isinstance(value, list) else [value])
+    return collected
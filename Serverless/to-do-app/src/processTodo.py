@@ -1,25 +1,188 @@
 import json
 import os
-import boto3
+import random
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
+from src import metrics, runtime
 
-dynamodb = boto3.resource('dynamodb')
 table_name = os.environ['TABLE_NAME']
-table = dynamodb.Table(table_name)
+meta_table_name = os.environ.get('META_TABLE_NAME')
 
+BATCH_WRITE_SIZE = 25 # DynamoDB limit for batch_write_item
+MAX_WRITE_ATTEMPTS = 5
+# Todo ids are uuid5(IDEMPOTENCY_NAMESPACE, "<owner>:<idempotency key>"), so a redelivered message maps
+# to the same item, while two owners using the same key still get two todos
+IDEMPOTENCY_NAMESPACE = uuid.UUID('66456e61-1e0e-4f70-89c1-3c1e0e9bc725')
+PUT_WORKERS = 8 # concurrent conditional puts, below the client's connection pool size
+
+@runtime.handler
 def handler(event, context):
+    """
+    Writes a whole SQS batch. Todos with an idempotency key are written with conditional
+    puts (attribute_not_exists(id)) in parallel, so a redelivered or re-driven message can
+    never overwrite its todo; messages queued before keys existed go through batch_write_item.
+    Only the messages that couldn't be written are reported back in batchItemFailures,
+    so SQS retries (and eventually dead-letters) those and deletes the rest.
+    """
+    failed_ids = []
+    duplicates = 0
+    written = 0
+    items = {} # todo id -> (item, SQS messageIds, keyed)
+    now_ms = time.time() * 1000
+    metrics.put('BatchSize', len(event['Records']))
+
     for record in event['Records']:
-        body = json.loads(record['body'])
-        task = body['task']
-        todo_id = str(uuid.uuid4())
-
-        table.put_item(
-            Item={
-                'id': todo_id,
-                'task': task,
-                'completed': False
-            }
+        attributes = record.get('attributes', {})
+        # Time spent in the queue, and since the first (possibly failed) delivery
+        if 'SentTimestamp' in attributes:
+            metrics.put('MessageAge', now_ms - int(attributes['SentTimestamp']), 'Milliseconds')
+        if 'ApproximateFirstReceiveTimestamp' in attributes:
+            metrics.put('FirstReceiveAge', now_ms - int(attributes['ApproximateFirstReceiveTimestamp']), 'Milliseconds')
+        try:
+            body = json.loads(record['body'])
+            item = build_item(body, record['messageId'])
+            keyed = bool(body.get('idempotency_key'))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Invalid message {record['messageId']}: {e}")
+            failed_ids.append(record['messageId'])
+            continue
+        if item['id'] in items:
+            # Same key twice in one batch; both messages succeed or fail with the one write
+            items[item['id']][1].append(record['messageId'])
+            duplicates += 1
+            continue
+        items[item['id']] = (item, [record['messageId']], keyed)
+
+    keyed = [(item, message_ids) for item, message_ids, is_keyed in items.values() if is_keyed]
+    if keyed:
+        with ThreadPoolExecutor(max_workers=min(PUT_WORKERS, len(keyed))) as pool:
+            outcomes = list(pool.map(metrics.propagate(put_if_absent), [item for item, _ in keyed]))
+        for (item, message_ids), outcome in zip(keyed, outcomes):
+            if outcome is None:
+                failed_ids.extend(message_ids)
+            elif outcome:
+                written += 1
+            else:
+                duplicates += 1
+
+    legacy = [(item, message_ids) for item, message_ids, is_keyed in items.values() if not is_keyed]
+    for start in range(0, len(legacy), BATCH_WRITE_SIZE):
+        chunk = legacy[start:start + BATCH_WRITE_SIZE]
+        try:
+            existing = existing_ids([item['id'] for item, _ in chunk])
+            new_items = [item for item, _ in chunk if item['id'] not in existing]
+            unprocessed = write_chunk(new_items) if new_items else set()
+        except Exception as e:
+            print(f"[DynamoDB ERROR] batch of {len(chunk)} todos failed: {e}")
+            existing = set()
+            unprocessed = {item['id'] for item, _ in chunk}
+        duplicates += len(existing)
+
+        for item, message_ids in chunk:
+            if item['id'] in unprocessed:
+                failed_ids.extend(message_ids)
+            elif item['id'] not in existing:
+                written += 1
+
+    if written:
+        bump_version()
+
+    print(f"Processed {len(event['Records'])} messages: {written} todos written, "
+          f"{duplicates} duplicates skipped, {len(failed_ids)} failed and will be retried.")
+    metrics.put('TodosWritten', written)
+    metrics.put('DuplicatesSuppressed', duplicates)
+    metrics.put('BatchItemFailures', len(failed_ids))
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_ids]}
+
+def build_item(body, message_id):
+    task = body['task']
+    if not task:
+        raise ValueError("Task is required")
+    # Messages queued before idempotency keys existed fall back to their SQS message id
+    key = body.get('idempotency_key') or message_id
+    if not isinstance(key, str):
+        raise TypeError("idempotency_key must be a string")
+
+    owner = body.get('owner') or ''
+    item = {
+        # Keys are only unique per owner (the caller picks them), so the owner is part of the id
+        'id': str(uuid.uuid5(IDEMPOTENCY_NAMESPACE, f"{owner}:{key}")),
+        'idempotency_key': key,
+        'task': task,
+        'completed': False,
+        # Keys of the status-created_at and owner-created_at indexes
+        'status': 'open',
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+    # Index keys can't be empty, so todos without an owner stay out of that index
+    if body.get('owner'):
+        item['owner'] = body['owner']
+    return item
+
+def bump_version():
+    """Marks the todos as changed, so warm getTodos containers drop their cached pages."""
+    if not meta_table_name:
+        return
+    try:
+        metrics.call(
+            'UpdateItem',
+            runtime.table(meta_table_name).update_item,
+            Key={'id': 'todos'},
+            UpdateExpression='ADD #version :one',
+            ExpressionAttributeNames={'#version': 'version'},
+            ExpressionAttributeValues={':one': 1}
         )
-        print(f"Successfully processed todo with id: {todo_id}")
+    except Exception as e:
+        # The todos are written; getTodos only serves stale pages until its cache TTL runs out
+        print(f"[DynamoDB ERROR] could not bump the todos version: {e}")
+
+def put_if_absent(item):
+    """
+    Writes one todo unless its id exists. Returns True if written, False for an existing todo
+    and None if the write failed (botocore has already retried throttling by then).
+    """
+    try:
+        metrics.call('PutItem', runtime.table(table_name).meta.client.put_item,
+                     TableName=table_name, Item=item, ConditionExpression='attribute_not_exists(id)',
+                     ReturnConsumedCapacity='TOTAL')
+    except Exception as e:
+        if isinstance(e, ClientError) and e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        print(f"[DynamoDB ERROR] todo {item['id']} failed: {e}")
+        return None
+    return True
+
+def existing_ids(ids):
+    """Returns which of up to 100 todo ids are already in the table."""
+    found = set()
+    request = {table_name: {'Keys': [{'id': todo_id} for todo_id in ids], 'ProjectionExpression': 'id'}}
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        if attempt:
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        response = metrics.call('BatchGetItem', runtime.table(table_name).meta.client.batch_get_item,
+                                RequestItems=request, ReturnConsumedCapacity='TOTAL')
+        found.update(item['id'] for item in response.get('Responses', {}).get(table_name, []))
+        request = response.get('UnprocessedKeys')
+        if not request:
+            return found
+    raise RuntimeError(f"{len(request[table_name]['Keys'])} keys still unprocessed by batch_get_item")
 
-    return {'statusCode': 200}
+def write_chunk(items):
+    """
+    Puts up to 25 items, retrying UnprocessedItems with exponential backoff and jitter.
+    Returns the ids of the items that are still unprocessed after the last attempt.
+    """
+    requests = [{'PutRequest': {'Item': item}} for item in items]
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        if attempt:
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        # The resource's client accepts plain Python types
+        response = metrics.call('BatchWriteItem', runtime.table(table_name).meta.client.batch_write_item,
+                                RequestItems={table_name: requests}, ReturnConsumedCapacity='TOTAL')
+        requests = response.get('UnprocessedItems', {}).get(table_name, [])
+        if not requests:
+            return set()
+    return {request['PutRequest']['Item']['id'] for request in requests}
@@ -1,33 +1,193 @@
+import json
 import os
-import boto3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src import metrics, runtime
 
-sqs = boto3.client('sqs')
 dlq_url = os.environ['DLQ_URL']
 queue_url = os.environ['QUEUE_URL']
 
+SQS_BATCH_SIZE = 10 # SQS limit for receive/send/delete batches
+DEFAULT_WORKERS = 4
+# Stop receiving when the invocation has less time left than this
+SAFETY_MARGIN_MS = 10000
+MAX_VISIBILITY_TIMEOUT = 43200
+
+@runtime.handler
 def handler(event, context):
+    """
+    Moves messages from the DLQ back to the main queue.
+    Event (all optional):
+      drain          - keep going until the DLQ is empty or the invocation is about to time out
+      workers        - concurrent receive workers in drain mode (default 4)
+      max_per_second - caps how fast messages are sent back, so processTodo isn't flooded
+      match          - only re-drive messages whose JSON body has these field values, e.g. {"owner": "alice"}
+    """
+    event = event or {}
     try:
-        messages = sqs.receive_message(
-            QueueUrl=dlq_url,
-            MaxNumberOfMessages=10,
-            WaitTimeSeconds=5
+        redrive = Redrive(
+            context,
+            match=event.get('match'),
+            max_per_second=event.get('max_per_second')
         )
-
-        if 'Messages' in messages:
-            for message in messages['Messages']:
-                sqs.send_message(
-                    QueueUrl=queue_url,
-                    MessageBody=message['Body']
-                )
-                sqs.delete_message(
-                    QueueUrl=dlq_url,
-                    ReceiptHandle=message['ReceiptHandle']
-                )
-                print(f"Message with id {message['MessageId']} re-driven to main queue.")
-            return {'statusCode': 200, 'body': f"{len(messages['Messages'])} messages re-driven."}
+        if event.get('drain'):
+            redrive.drain(int(event.get('workers', DEFAULT_WORKERS)))
         else:
+            redrive.run_once()
+
+        if not redrive.received:
             print("No messages to re-drive.")
             return {'statusCode': 200, 'body': 'No messages to re-drive.'}
+        print(redrive.summary())
+        metrics.put('MessagesRedriven', redrive.moved)
+        metrics.put('MessagesSkipped', redrive.skipped)
+        metrics.put('MessagesFailed', redrive.failed)
+        return {'statusCode': 200, 'body': redrive.summary()}
     except Exception as e:
         print(f"Error re-driving messages: {e}")
         return {'statusCode': 500, 'body': 'Error re-driving messages.'}
+
+class RateLimiter:
+    """Token bucket shared by the workers; acquire(n) blocks until n messages may be sent."""
+    def __init__(self, per_second):
+        self.rate = float(per_second)
+        self.capacity = max(self.rate, SQS_BATCH_SIZE)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= count:
+                    self.tokens -= count
+                    return
+                wait = (count - self.tokens) / self.rate
+            time.sleep(wait)
+
+class Redrive:
+    def __init__(self, context, match=None, max_per_second=None):
+        self.context = context
+        self.match = match or {}
+        self.limiter = RateLimiter(max_per_second) if max_per_second else None
+        self.lock = threading.Lock()
+        self.received = 0
+        self.moved = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def run_once(self):
+        """The original behaviour: a single receive of up to 10 messages."""
+        self.process(self.receive(wait_seconds=5))
+
+    def drain(self, workers):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(metrics.propagate(self.drain_worker)) for _ in range(workers)]:
+                future.result()
+
+    def drain_worker(self):
+        while self.remaining_ms() > SAFETY_MARGIN_MS:
+            messages = self.receive(wait_seconds=2)
+            if not messages:
+                return # the DLQ is empty
+            self.process(messages)
+
+    def receive(self, wait_seconds):
+        response = metrics.call(
+            'ReceiveMessage',
+            runtime.client('sqs').receive_message,
+            QueueUrl=dlq_url,
+            MaxNumberOfMessages=SQS_BATCH_SIZE,
+            WaitTimeSeconds=wait_seconds,
+            # Hidden until this invocation ends, so skipped or failed messages aren't received twice
+            VisibilityTimeout=self.visibility_timeout(),
+            MessageAttributeNames=['All'],
+            MessageSystemAttributeNames=['MessageGroupId', 'MessageDeduplicationId']
+        )
+        messages = response.get('Messages', [])
+        self.count(received=len(messages))
+        return messages
+
+    def process(self, messages):
+        selected = [message for message in messages if self.matches(message)]
+        self.count(skipped=len(messages) - len(selected))
+        if not selected:
+            return
+        if self.limiter:
+            self.limiter.acquire(len(selected))
+
+        by_id = {str(idx): message for idx, message in enumerate(selected)}
+        response = metrics.call(
+            'SendMessageBatch',
+            runtime.client('sqs').send_message_batch,
+            QueueUrl=queue_url,
+            Entries=[send_entry(entry_id, message) for entry_id, message in by_id.items()]
+        )
+        for failure in response.get('Failed', []):
+            print(f"Message with id {by_id[failure['Id']]['MessageId']} could not be re-driven: {failure.get('Message')}")
+
+        # Only delete what reached the main queue; the rest stays in the DLQ
+        sent = [by_id[entry['Id']] for entry in response.get('Successful', [])]
+        if sent:
+            deleted = metrics.call(
+                'DeleteMessageBatch',
+                runtime.client('sqs').delete_message_batch,
+                QueueUrl=dlq_url,
+                Entries=[
+                    {'Id': str(idx), 'ReceiptHandle': message['ReceiptHandle']}
+                    for idx, message in enumerate(sent)
+                ]
+            )
+            for failure in deleted.get('Failed', []):
+                # Already on the main queue, so processTodo may see it twice
+                print(f"Message with id {sent[int(failure['Id'])]['MessageId']} re-driven but not deleted from the DLQ: {failure.get('Message')}")
+        self.count(moved=len(sent), failed=len(response.get('Failed', [])))
+
+    def matches(self, message):
+        if not self.match:
+            return True
+        try:
+            body = json.loads(message['Body'])
+        except ValueError:
+            return False
+        return isinstance(body, dict) and all(body.get(key) == value for key, value in self.match.items())
+
+    def remaining_ms(self):
+        # context is None when the handler is called outside Lambda
+        return self.context.get_remaining_time_in_millis() if self.context else float('inf')
+
+    def visibility_timeout(self):
+        remaining = self.remaining_ms()
+        if remaining == float('inf'):
+            return 30
+        return min(int(remaining / 1000) + 60, MAX_VISIBILITY_TIMEOUT)
+
+    def count(self, received=0, moved=0, skipped=0, failed=0):
+        with self.lock:
+            self.received += received
+            self.moved += moved
+            self.skipped += skipped
+            self.failed += failed
+
+    def summary(self):
+        return f"{self.moved} messages re-driven, {self.skipped} skipped, {self.failed} failed."
+
+def send_entry(entry_id, message):
+    """Copies body, message attributes and (for FIFO queues) group/dedup ids."""
+    entry = {'Id': entry_id, 'MessageBody': message['Body']}
+    attributes = {
+        name: {key: value for key, value in attribute.items() if key in ('DataType', 'StringValue', 'BinaryValue')}
+        for name, attribute in message.get('MessageAttributes', {}).items()
+    }
+    if attributes:
+        entry['MessageAttributes'] = attributes
+    system = message.get('Attributes', {})
+    if 'MessageGroupId' in system:
+        entry['MessageGroupId'] = system['MessageGroupId']
+    if 'MessageDeduplicationId' in system:
+        entry['MessageDeduplicationId'] = system['MessageDeduplicationId']
+    return entry
@@ -0,0 +1,89 @@
+import functools
+import os
+import threading
+import time
+
+# Taken when the first handler module imports this one, i.e. at the start of the Lambda init phase
+INIT_START = time.perf_counter()
+
+import boto3
+from botocore.config import Config
+from src import metrics
+
+### Shared by every handler: AWS clients are created on first use and then cached for the
+### lifetime of the (warm) container, with connection pool, retry and timeout settings tuned
+### for short calls to SQS/DynamoDB over VPC endpoints.
+BOTO_CONFIG = Config(
+    max_pool_connections=int(os.environ.get('BOTO_MAX_POOL_CONNECTIONS', '16')), # >= threads used by a handler
+    retries={'mode': 'standard', 'max_attempts': int(os.environ.get('BOTO_MAX_ATTEMPTS', '3'))},
+    connect_timeout=float(os.environ.get('BOTO_CONNECT_TIMEOUT', '2')),
+    read_timeout=float(os.environ.get('BOTO_READ_TIMEOUT', '10')), # > the longest SQS long poll (5s)
+    tcp_keepalive=True
+)
+
+_cache = {}
+_lock = threading.RLock() # table() creates the resource while holding it
+_session = None
+_process_cold = True
+
+def client(service):
+    """Cached low-level client, e.g. client('sqs')."""
+    return _get(('client', service), lambda: _get_session().client(service, config=BOTO_CONFIG))
+
+def resource(service):
+    """Cached resource, e.g. resource('dynamodb')."""
+    return _get(('resource', service), lambda: _get_session().resource(service, config=BOTO_CONFIG))
+
+def table(name):
+    """Cached DynamoDB Table. Its meta.client is the thread-safe client behind the resource."""
+    return _get(('table', name), lambda: resource('dynamodb').Table(name))
+
+def register(kind, name, obj):
+    """Puts a ready-made client/resource/table in the cache. The local benchmarks use it to install in-memory fakes."""
+    with _lock:
+        _cache[(kind, name)] = obj
+
+def _get(key, factory):
+    obj = _cache.get(key)
+    if obj is not None:
+        return obj
+    # boto3 sessions aren't thread-safe, so clients are created one at a time
+    with _lock:
+        if key not in _cache:
+            _cache[key] = factory()
+        return _cache[key]
+
+def _get_session():
+    # Only called with _lock held
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+def handler(func):
+    """
+    Decorates a Lambda handler: records its Duration and ColdStart (the handler's first invocation
+    in this process) and prints the invocation's metrics. InitDuration, from the import of this
+    module to the first invocation, is only recorded by the first handler the process runs.
+    Every invocation collects its metrics in its own buffer (see metrics.invocation).
+    """
+    dimensions = {'Function': os.environ.get('AWS_LAMBDA_FUNCTION_NAME', func.__name__)}
+    state = {'cold': True}
+
+    @functools.wraps(func)
+    def wrapper(event, context):
+        global _process_cold
+        start = time.perf_counter()
+        with _lock:
+            cold, state['cold'] = state['cold'], False
+            process_cold, _process_cold = _process_cold, False
+        with metrics.invocation():
+            try:
+                return func(event, context)
+            finally:
+                metrics.put('Duration', (time.perf_counter() - start) * 1000, 'Milliseconds')
+                metrics.put('ColdStart', 1 if cold else 0)
+                if process_cold:
+                    metrics.put('InitDuration', (start - INIT_START) * 1000, 'Milliseconds')
+                metrics.flush(dimensions)
+    return wrapper
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from bench import fakes
+
+# The handlers read their configuration at import time
+os.environ.update(fakes.ENV)
+
+
+@pytest.fixture
+def aws():
+    """Fresh in-memory SQS and DynamoDB (bench/fakes.py), registered with src.runtime."""
+    from src import getTodo
+    getTodo._cache.clear()
+    return fakes.install()
@@ -0,0 +1,38 @@
+import json
+
+from src import createTodo, runtime
+
+
+class FailingSQS:
+    """An SQS client whose send_message_batch always fails, e.g. throttled or unreachable."""
+    def send_message_batch(self, **kwargs):
+        raise ConnectionError("SQS unavailable")
+
+
+def create_todos(todos):
+    response = createTodo.createTodos({'body': json.dumps(todos), 'headers': {}}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+
+def test_valid_batch_is_accepted(aws):
+    status, body = create_todos([{'task': 'a'}, {'task': 'b'}])
+    assert status == 202
+    assert body['accepted'] == 2
+
+
+def test_invalid_todos_only_are_a_client_error(aws):
+    status, body = create_todos([{'task': ''}, {'owner': 'alice'}])
+    assert status == 400
+    assert body['rejected'] == 2 and body['failed'] == 0
+
+
+def test_sqs_failure_is_not_reported_as_a_client_error(aws):
+    runtime.register('client', 'sqs', FailingSQS())
+
+    status, body = create_todos([{'task': 'a'}, {'task': 'b'}])
+    assert status == 503
+    assert [result['status'] for result in body['results']] == ['failed', 'failed']
+
+    status, body = create_todos([{'task': 'a'}, {'task': ''}])
+    assert status == 207
+    assert (body['rejected'], body['failed']) == (1, 1)
@@ -0,0 +1,42 @@
+import json
+
+from botocore.exceptions import ClientError
+
+from bench import fakes
+from src import getTodo, runtime
+
+
+class UnavailableTable:
+    """A table whose every read fails, like TodoMetaTable during an outage."""
+    def get_item(self, **kwargs):
+        raise ClientError({'Error': {'Code': 'InternalServerError', 'Message': 'unavailable'}}, 'GetItem')
+
+
+def get_todos(params):
+    return getTodo.getTodos({'queryStringParameters': params}, None)
+
+
+def test_page_is_served_from_the_table_when_the_version_marker_fails(aws):
+    _, db = aws
+    fakes.seed_todos(db, fakes.TABLE_NAME, 5)
+    runtime.register('table', fakes.META_TABLE_NAME, UnavailableTable())
+
+    response = get_todos({'limit': '10'})
+
+    assert response['statusCode'] == 200
+    assert response['headers']['X-Cache'] == 'BYPASS'
+    assert len(json.loads(response['body'])['items']) == 5
+    # Nothing was cached under an unknown version
+    assert getTodo._cache == {}
+
+
+def test_cache_is_used_again_once_the_version_marker_is_back(aws):
+    _, db = aws
+    fakes.seed_todos(db, fakes.TABLE_NAME, 5)
+    runtime.register('table', fakes.META_TABLE_NAME, UnavailableTable())
+    get_todos({'limit': '10'})
+
+    runtime.register('table', fakes.META_TABLE_NAME, db.Table(fakes.META_TABLE_NAME))
+
+    assert get_todos({'limit': '10'})['headers']['X-Cache'] == 'MISS'
+    assert get_todos({'limit': '10'})['headers']['X-Cache'] == 'HIT'